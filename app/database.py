@@ -1,6 +1,12 @@
+import asyncio
+import logging
 import motor.motor_asyncio
 from dotenv import load_dotenv
 import os
+from pymongo import ReadPreference
+from app.services.metrics import command_listener, pool_listener, registry
+
+logger = logging.getLogger(__name__)
 
 # Cargar variables del .env
 load_dotenv()
@@ -13,6 +19,61 @@ missing = [var for var in required_vars if not os.getenv(var)]
 if missing:
     raise RuntimeError(f"Faltan variables de entorno: {', '.join(missing)}")
 
+# ─── Pool de conexiones ────────────────────────────────────────────────────────
+# Cada worker de gunicorn tiene su propio cliente: el total de conexiones hacia
+# Cosmos es workers × MONGO_MAX_POOL_SIZE.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "120000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "15000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+# Conexiones abiertas al arrancar, antes de recibir tráfico
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", str(MONGO_MIN_POOL_SIZE)))
+# Preferencia de lectura de read_db (solo lectura tolerante a atraso: listados, detalle, historial).
+# El tablero en memoria se carga siempre del primario: luego se actualiza por incrementos
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
 
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
+# 📊 Los listeners registran comandos y estado del pool para /metrics
+client = motor.motor_asyncio.AsyncIOMotorClient(
+    MONGO_URI,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    appname=os.getenv("MONGO_APP_NAME", "code-arena-api"),
+    event_listeners=[command_listener, pool_listener],
+)
 db = client[MONGO_DB]
+read_db = client.get_database(MONGO_DB, read_preference=READ_PREFERENCES[MONGO_READ_PREFERENCE])
+
+
+async def connect() -> None:
+    # 🔥 Calentamiento: pings concurrentes abren conexiones antes del primer request
+    await asyncio.gather(*(db.command("ping") for _ in range(max(1, MONGO_WARMUP_CONNECTIONS))))
+    logger.info("Mongo listo: %s conexiones abiertas", registry.pool.snapshot()["open"])
+
+
+def close() -> None:
+    client.close()
+
+
+def pool_stats() -> dict:
+    return {
+        **registry.pool.snapshot(),
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "readPreference": MONGO_READ_PREFERENCE,
+    }
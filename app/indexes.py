@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# ─── Índices requeridos por colección ──────────────────────────────────────────
+# Cada consulta caliente del código debe tener aquí su índice. users._id ya
+# viene indexado por Mongo.
+INDEXES: dict[str, list[IndexModel]] = {
+    "competition": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("date", DESCENDING), ("id", DESCENDING)], name="date_id"),
+        IndexModel([("status", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)], name="status_date_id"),
+    ],
+    "teams": [
+        IndexModel([("code", ASCENDING)], name="code_unique", unique=True),
+    ],
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("teamCode", ASCENDING)], name="teamCode"),
+    ],
+    "submissions": [
+        IndexModel(
+            [("competitionId", ASCENDING), ("teamCode", ASCENDING), ("time", ASCENDING)],
+            name="competition_team_time",
+        ),
+        IndexModel([("competitionId", ASCENDING), ("time", ASCENDING)], name="competition_time"),
+        # $lookup de RANKING_ENGINE=aggregate (foreignField teamCode): sin este índice
+        # cada equipo recorre toda la colección
+        IndexModel([("teamCode", ASCENDING), ("competitionId", ASCENDING)], name="team_competition"),
+        # Un solo AC por (competencia, equipo, problema); solo los AC tienen acKey
+        IndexModel([("acKey", ASCENDING)], name="ac_key_unique", unique=True, sparse=True),
+        # Cola de verificación: envíos PENDING en orden de llegada
+        IndexModel([("status", ASCENDING), ("time", ASCENDING)], name="status_time"),
+    ],
+    # Bus de eventos entre workers (EVENT_BUS=mongo): solo importa lo reciente
+    "events": [
+        IndexModel([("at", ASCENDING)], name="at_ttl", expireAfterSeconds=3600),
+    ],
+    "ranking_snapshots": [
+        IndexModel(
+            [("competitionId", ASCENDING), ("kind", ASCENDING), ("at", ASCENDING)],
+            name="competition_kind_at", unique=True,
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db) -> None:
+    for collection, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                # Ej: datos duplicados que impiden un índice único; se reporta y se sigue
+                logger.error("No se pudo crear el índice %s.%s: %s", collection, model.document["name"], e)
+
+
+async def _usage(db, collection: str) -> dict[str, int] | None:
+    try:
+        stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(length=None)
+    except Exception:
+        return None  # $indexStats no está disponible en todos los motores (ej. Cosmos)
+    return {s["name"]: s.get("accesses", {}).get("ops", 0) for s in stats}
+
+
+async def report_indexes(db) -> dict:
+    report = {}
+    for collection, models in INDEXES.items():
+        existing = {index["name"] async for index in db[collection].list_indexes()}
+        declared = {model.document["name"] for model in models}
+        usage = await _usage(db, collection)
+
+        report[collection] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared - {"_id_"}),
+            "unused": sorted(name for name, ops in (usage or {}).items() if ops == 0 and name != "_id_"),
+        }
+
+        if report[collection]["missing"]:
+            logger.warning("Índices faltantes en %s: %s", collection, report[collection]["missing"])
+        if report[collection]["unused"]:
+            logger.info("Índices sin uso en %s: %s", collection, report[collection]["unused"])
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    from app.database import db
+
+    async def main():
+        await ensure_indexes(db)
+        print(json.dumps(await report_indexes(db), indent=2, ensure_ascii=False))
+
+    asyncio.run(main())
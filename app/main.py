@@ -1,8 +1,59 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.routes import auth, competition, users, teams, ranking
+from app import database
+from app.database import db
+from app.indexes import ensure_indexes, report_indexes
+from app.services import events, leetcode_api, problem_catalog, scoreboard, verification
+from app.services.metrics import MetricsMiddleware, registry
+from app.services.snapshots import run_snapshot_writer
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Competencias Universitarias - Backend")
+# 🛰️ Errores y trazas a Sentry solo si hay DSN configurado
+if os.getenv("SENTRY_DSN"):
+    sentry_sdk.init(
+        dsn=os.environ["SENTRY_DSN"],
+        environment=os.getenv("SENTRY_ENVIRONMENT", "production"),
+        traces_sample_rate=float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.05")),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🔌 Pool de conexiones caliente antes del primer request
+    await database.connect()
+
+    # 🗂️ Índices de las consultas calientes, antes de aceptar tráfico
+    await ensure_indexes(db)
+    await report_indexes(db)
+
+    # 📸 Snapshots periódicos del ranking para congelamiento e historial
+    tasks = [
+        asyncio.create_task(run_snapshot_writer()),
+        # 📚 Catálogo local de problemas de LeetCode, refrescado al vencer su TTL
+        asyncio.create_task(problem_catalog.run_catalog_refresher()),
+        # 📡 Invalidaciones publicadas por los demás workers (EVENT_BUS=mongo|redis)
+        asyncio.create_task(events.run_event_listener()),
+        # ♻️ Tableros con suscriptores SSE recargados al vencer su antigüedad máxima
+        asyncio.create_task(scoreboard.run_board_refresher()),
+    ]
+    # 🔎 Worker de verificación de envíos contra LeetCode (LEETCODE_VERIFY=true)
+    if verification.VERIFY_ENABLED:
+        tasks.append(asyncio.create_task(verification.run_verification_worker()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await leetcode_api.close_client()
+    database.close()
+
+
+app = FastAPI(title="Competencias Universitarias - Backend", lifespan=lifespan)
 
 # Lista explícita de orígenes permitidos (ajusta según tu frontend)
 origins = [
@@ -18,6 +69,9 @@ app.add_middleware(
     allow_headers=["*"],                # Headers permitidos
 )
 
+# 📊 Latencia por ruta y viajes a Mongo por petición, expuestos en /metrics
+app.add_middleware(MetricsMiddleware)
+
 
 # Incluir rutas
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
@@ -29,3 +83,13 @@ app.include_router(competition.router, prefix="/competition", tags=["Competition
 @app.get("/")
 def root():
     return {"message": "Bienvenido a la API de Competencias Universitarias"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/pool", include_in_schema=False)
+def metrics_pool():
+    return database.pool_stats()
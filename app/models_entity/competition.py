@@ -8,6 +8,11 @@ class Scoring(BaseModel):
     medium: int
     hard: int
 
+class ScoringRule(BaseModel):
+    name: Literal["first_blood", "icpc_penalty"]
+    bonus: int = 0     # first_blood: puntos extra para el primer equipo en resolver
+    minutes: int = 20  # icpc_penalty: minutos por intento fallido
+
 class Problem(BaseModel):
     id: str
     title: str
@@ -17,6 +22,16 @@ class Problem(BaseModel):
     isValid: bool
     isValidating: bool
 
+class RequestProblem(BaseModel):
+    # Título y dificultad se completan desde el catálogo local si se omiten
+    id: Optional[str] = None
+    title: Optional[str] = None
+    difficulty: Optional[Literal["easy", "medium", "hard"]] = None
+    url: HttpUrl
+    slug: Optional[str] = None
+    isValid: bool = False
+    isValidating: bool = False
+
 class Competition(BaseModel):
     id: Optional[str] = None
     title: str
@@ -29,6 +44,8 @@ class Competition(BaseModel):
     problems: List[Problem]
     rules: List[str]
     scoring: Scoring
+    scoringRules: Optional[List[ScoringRule]] = []
+    freezeMinutes: Optional[int] = None  # minutos finales con el ranking público congelado
 
 class RequestCompetition(BaseModel):
     id: Optional[str] = None
@@ -38,6 +55,11 @@ class RequestCompetition(BaseModel):
     date: datetime
     status: Literal["active", "inactive", "completed", "upcoming"]
     duration: int  # Ej: "2 horas", o puedes normalizarlo a minutos si prefieres
-    problems: List[Problem]
+    problems: List[RequestProblem]
     rules: List[str]
-    scoring: Scoring
\ No newline at end of file
+    scoring: Scoring
+    scoringRules: Optional[List[ScoringRule]] = []
+    freezeMinutes: Optional[int] = None  # minutos finales con el ranking público congelado
+
+class BulkJoinRequest(BaseModel):
+    teamCodes: List[str] = Field(min_length=1, max_length=5000)
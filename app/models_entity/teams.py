@@ -6,11 +6,17 @@ from pydantic import BaseModel
 # Modelo de submission
 class Submission(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
+    competitionId: Optional[str] = None
+    teamCode: Optional[str] = None
     problem: str
-    status: Literal["AC" , "WA" , "TLE"]
+    status: Literal["AC" , "WA" , "TLE", "PENDING"]
     time: int
     member: str
     points: int
+    penalty: Optional[int] = 0  # segundos de penalización (reglas estilo ICPC)
+
+class SubmissionBatchRequest(BaseModel):
+    problems: List[str] = Field(min_length=1, max_length=100)
 
 class TeamCode(BaseModel):
     id: Optional[str] = None
@@ -21,7 +27,7 @@ class TeamCode(BaseModel):
     maxMembers: int
     currentMembers: int
     points: Optional[int] = 0
-    submissions: Optional[List[Submission]] = []
+    solved: Optional[List[str]] = []
 
 class TeamCreateRequest(BaseModel):
     teamName: str
@@ -29,5 +35,12 @@ class TeamCreateRequest(BaseModel):
     avatar: str
     color:str
 
+class TeamImportRow(BaseModel):
+    teamName: str = Field(min_length=1)
+    avatar: str = ""
+    color: str = "#cccccc"
+    maxMembers: int = Field(default=3, ge=1)
+    members: List[str] = []  # usernames ya registrados
+
 class JoinTeamRequest(BaseModel):
     teamCode: str
\ No newline at end of file
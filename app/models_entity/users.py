@@ -2,6 +2,9 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from typing import Optional
 
+# Usuarios de LeetCode: letras, dígitos, guion y guion bajo
+LEETCODE_HANDLE = r"^[A-Za-z0-9_-]{1,40}$"
+
 
 # Usuario
 class User(BaseModel):
@@ -16,3 +19,8 @@ class RegisterRequest(BaseModel):
     username: str
     email: EmailStr
     password: str
+    leetcode_username: Optional[str] = Field(default=None, pattern=LEETCODE_HANDLE)
+
+class ProfileUpdateRequest(BaseModel):
+    # Necesario con LEETCODE_VERIFY=true: los envíos se verifican contra este usuario
+    leetcode_username: Optional[str] = Field(default=None, pattern=LEETCODE_HANDLE)
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
+
+# Vistas de respuesta para rutas calientes: dataclasses con __slots__ armadas
+# directamente desde documentos de Mongo (datos confiables, sin re-validar) y
+# serializadas de forma nativa por orjson. Cada vista declara su proyección.
+
+
+def projection(view: type, rename: Optional[dict] = None) -> dict:
+    """Proyección de Mongo con solo los campos declarados por la vista."""
+    rename = rename or {}
+    spec = {rename.get(f.name, f.name): 1 for f in fields(view)}
+    if "_id" not in spec:
+        spec["_id"] = 0
+    return spec
+
+
+@dataclass(slots=True)
+class TeamView:
+    id: str
+    code: str
+    teamName: str
+    avatar: str
+    color: str
+    maxMembers: int
+    currentMembers: int
+    points: int = 0
+    solved: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "TeamView":
+        return cls(
+            id=str(doc["_id"]),
+            code=doc["code"],
+            teamName=doc.get("teamName", ""),
+            avatar=doc.get("avatar", ""),
+            color=doc.get("color", ""),
+            maxMembers=doc.get("maxMembers", 0),
+            currentMembers=doc.get("currentMembers", 0),
+            points=doc.get("points", 0),
+            solved=doc.get("solved") or [],
+        )
+
+
+@dataclass(slots=True)
+class MemberView:
+    id: str
+    username: str
+    email: str
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "MemberView":
+        return cls(id=str(doc["_id"]), username=doc["username"], email=doc.get("email", ""))
+
+
+@dataclass(slots=True)
+class PublicMemberView:
+    id: str
+    username: str
+    leetcode: Optional[str]
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "PublicMemberView":
+        return cls(id=str(doc["_id"]), username=doc["username"], leetcode=doc.get("leetcode_username"))
+
+
+@dataclass(slots=True)
+class SubmissionView:
+    id: str
+    competitionId: str
+    teamCode: str
+    problem: str
+    status: str
+    time: int
+    member: str
+    points: int
+    penalty: int = 0
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "SubmissionView":
+        return cls(
+            id=str(doc["_id"]),
+            competitionId=doc.get("competitionId", ""),
+            teamCode=doc.get("teamCode", ""),
+            problem=doc["problem"],
+            status=doc["status"],
+            time=doc["time"],
+            member=doc.get("member", ""),
+            points=doc.get("points", 0),
+            penalty=doc.get("penalty") or 0,
+        )
+
+
+TEAM_FIELDS = projection(TeamView, {"id": "_id"})
+MEMBER_FIELDS = projection(MemberView, {"id": "_id"})
+PUBLIC_MEMBER_FIELDS = projection(PublicMemberView, {"id": "_id", "leetcode": "leetcode_username"})
+SUBMISSION_FIELDS = projection(SubmissionView, {"id": "_id"})
@@ -6,8 +6,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt, ExpiredSignatureError
-from passlib.context import CryptContext
 from app.database import db
+from app.services.cache import TwoLevelCache
+from app.services import events, hashing
+from app.services.metrics import registry
 
 # ─── Configuración de Seguridad ────────────────────────────────────────────────
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
@@ -15,17 +17,24 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 router = APIRouter()
 
+# Caché de usuarios por id: evita un viaje a Mongo en cada petición autenticada
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+user_cache = TwoLevelCache("user:", USER_CACHE_SIZE, USER_CACHE_TTL)
+# El L2 compartido se borra una vez; el L1 de cada worker, al recibir el evento
+events.subscribe(events.USER, user_cache.local.delete)
+
 # ─── Utilidades ────────────────────────────────────────────────────────────────
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# bcrypt corre en un pool acotado para no bloquear el event loop
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing.verify_password(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await hashing.hash_password(password)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
@@ -41,7 +50,7 @@ async def login(username: str = Form(...), password: str = Form(...)):
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
 
-    if not verify_password(password, user.get("password", "")):
+    if not await verify_password(password, user.get("password", "")):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Contraseña incorrecta")
 
     token_data = {
@@ -59,12 +68,7 @@ async def login(username: str = Form(...), password: str = Form(...)):
 
 # ─── Dependencia para obtener usuario actual ───────────────────────────────────
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token inválido o expirado",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def _token_user_id(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("id")
@@ -86,14 +90,61 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Token inválido",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    return user_id
 
-    user = await db["users"].find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise credentials_exception
 
+async def _load_user(user_id: str) -> dict:
+    user = await db["users"].find_one({"_id": ObjectId(user_id)}, {"password": 0})
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido o expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     user["_id"] = str(user["_id"])
+    await user_cache.set(user_id, user)
     return user
 
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    user_id = _token_user_id(token)
+    user = await user_cache.get(user_id)
+    if user is None:
+        user = await _load_user(user_id)
+
+    # Copia: las rutas mutan el dict y no deben tocar la entrada cacheada
+    return dict(user)
+
+
+async def get_current_user_fresh(token: str = Depends(oauth2_scheme)):
+    # ✍️ Rutas de escritura que dependen de `teamCode` (envíos, altas y bajas de equipo):
+    # siempre desde Mongo, porque otro worker pudo cambiarlo sin invalidar esta caché
+    return dict(await _load_user(_token_user_id(token)))
+
+
+async def invalidate_user(user_id: str | None) -> None:
+    if user_id:
+        await user_cache.delete(str(user_id))
+        await events.publish(events.USER, str(user_id))
+
+def _user_cache_metrics() -> list[tuple]:
+    # 📊 Expuesto en /metrics junto al resto de contadores del proceso
+    stats = user_cache.stats()
+    local = stats["local"]
+    hits, misses = [({"level": "local"}, local["hits"])], [({"level": "local"}, local["misses"])]
+    if "shared" in stats:
+        hits.append(({"level": "shared"}, stats["shared"]["hits"]))
+        misses.append(({"level": "shared"}, stats["shared"]["misses"]))
+    return [
+        ("user_cache_hits_total", "counter", "Aciertos de la caché de usuarios por nivel.", hits),
+        ("user_cache_misses_total", "counter", "Fallos de la caché de usuarios por nivel.", misses),
+        ("user_cache_evictions_total", "counter", "Usuarios desalojados de la caché local.", [({}, local["evictions"])]),
+        ("user_cache_entries", "gauge", "Usuarios en la caché local.", [({}, local["size"])]),
+    ]
+
+
+registry.register_collector(_user_cache_metrics)
+
 # ---------------------- verify_token ------------------------------------
 
 @router.get("/verify")
@@ -1,16 +1,80 @@
+import asyncio
+import base64
+import csv
+import json
+import os
 from datetime import datetime, timezone
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Body, status
-from app.models_entity.competition import Competition, RequestCompetition
-from app.database import db
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, File, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pymongo import DESCENDING, ReturnDocument
+from app.models_entity.competition import BulkJoinRequest, Competition, RequestCompetition
+from app.database import db, read_db
 import uuid
 
-from app.models_entity.teams import Submission
-from app.routes.auth import get_current_user
-from app.services.users import validate_competition_date
+from app.models_entity.teams import SubmissionBatchRequest
+from app.models_entity.views import PUBLIC_MEMBER_FIELDS, PublicMemberView
+from app.routes.auth import get_current_user, get_current_user_fresh, invalidate_user
+from app.routes.ranking import resolve_board
+from app.services import scoring, verification
+from app.services.scoring import CompiledCompetition
+from app.services.submissions import accept_solve, create_pending, frozen_until, list_team_submissions
+from app.services.cache import ResponseCache, cached_response
+from app.services.registration import IMPORT_MAX_ROWS, import_teams, parse_import, register_teams
+from app.services.serialization import FastJSONResponse, dumps
+from app.services import events, problem_catalog
 
 router = APIRouter()
 
+# Las definiciones de competencia casi no cambian durante el concurso
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+competition_cache = ResponseCache(int(os.getenv("RESPONSE_CACHE_SIZE", "512")), RESPONSE_CACHE_TTL)
+
+
+def invalidate_competition_cache(competition_id: Optional[str] = None) -> None:
+    competition_cache.invalidate("competition:list")
+    if competition_id:
+        competition_cache.invalidate(f"competition:{competition_id}")
+
+
+# 📡 Cualquier worker que cambie una competencia invalida las respuestas cacheadas de todos
+events.subscribe(events.COMPETITION, invalidate_competition_cache)
+
+
+def iso_utc(value: datetime) -> str:
+    # Formato único de `date` en Mongo: UTC, ancho fijo y sufijo Z, para que el orden
+    # de los strings sea el cronológico (filtros from/to y cursor por keyset).
+    # Una fecha sin zona se interpreta como UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def fill_from_catalog(problems: list[dict]) -> tuple[list[dict], list[str]]:
+    for problem in problems:
+        problem["slug"] = problem_catalog.slug_of(problem.get("slug"), problem.get("url"))
+
+    # Sin catálogo descargado aún no se bloquea la creación: se confía en lo enviado
+    if not problem_catalog.is_loaded():
+        return problems, []
+
+    unknown = []
+    for problem in problems:
+        slug = problem["slug"]
+        entry = problem_catalog.lookup(slug) if slug else None
+        if entry is None:
+            unknown.append(slug or str(problem.get("url")))
+            continue
+        problem.update(
+            slug=entry.slug,
+            title=problem.get("title") or entry.title,
+            difficulty=entry.difficulty,
+            isValid=True,
+            isValidating=False,
+        )
+    return problems, unknown
+
+
 @router.post("/create")
 async def create_competition(req: RequestCompetition):
     # Validación de campos obligatorios
@@ -22,6 +86,17 @@ async def create_competition(req: RequestCompetition):
     dict_req = req.dict()
     dict_req['id'] = str(uuid.uuid4())  # Asegúrate de convertirlo a string si el modelo espera str
 
+    # 📚 Validar y completar problemas contra el catálogo local (sin red en la petición)
+    dict_req['problems'], unknown = fill_from_catalog(dict_req['problems'])
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Problemas no encontrados en LeetCode: {', '.join(unknown)}")
+    incomplete = [p["slug"] or str(p["url"]) for p in dict_req['problems'] if not p.get("title") or not p.get("difficulty")]
+    if incomplete:
+        raise HTTPException(status_code=400, detail=f"Faltan título o dificultad en: {', '.join(incomplete)}")
+    for problem in dict_req['problems']:
+        if not problem.get("id"):
+            problem["id"] = str(uuid.uuid4())
+
     # Validar y transformar el modelo
     try:
         comp = Competition.model_validate(dict_req, strict=False)
@@ -36,9 +111,7 @@ async def create_competition(req: RequestCompetition):
 
     # Serializar para MongoDB
     comp_doc = comp.model_dump(mode="json")
-    for problem in comp_doc.get("problems", []):
-        if not problem.get("id"):
-            problem["id"] = str(uuid.uuid4())
+    comp_doc["date"] = iso_utc(comp.date)
 
     # Insertar en la base de datos
     try:
@@ -46,6 +119,8 @@ async def create_competition(req: RequestCompetition):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al guardar: {str(e)}")
 
+    await events.publish(events.COMPETITION)
+
     return {
         "message": "Competición creada exitosamente",
         "id": comp.title,
@@ -54,34 +129,109 @@ async def create_competition(req: RequestCompetition):
     }
 
 
-@router.get("/all")
-async def get_all_competitions():
-    try:
-        raw_comps = await db["competition"].find().to_list(length=100)
+# Campos de la vista resumida del listado: sin problemas, reglas ni equipos
+SUMMARY_FIELDS = {"_id": 0, "id": 1, "title": 1, "description": 1, "date": 1,
+                  "status": 1, "duration": 1, "maxTeamSize": 1, "scoring": 1}
 
-        competitions = []
-        for comp in raw_comps:
-            comp.pop("_id")
 
-            # Convertir fechas a datetime si están como string
-            if "date" in comp and isinstance(comp["date"], str):
-                try:
-                    comp["date"] = datetime.fromisoformat(comp["date"])
-                except Exception:
-                    pass  # Si falla, se deja como está
+def _normalize_competition(comp: dict) -> dict:
+    comp.pop("_id", None)
 
-            # Si hay fechas anidadas, como en problems
-            if "problems" in comp:
-                for p in comp["problems"]:
-                    if "_id" in p:
-                        p["id"] = str(p.pop("_id"))
+    # Convertir fechas a datetime si están como string
+    if "date" in comp and isinstance(comp["date"], str):
+        try:
+            comp["date"] = datetime.fromisoformat(comp["date"])
+        except Exception:
+            pass  # Si falla, se deja como está
 
-            competitions.append(comp)
+    # Si hay fechas anidadas, como en problems
+    if "problems" in comp:
+        for p in comp["problems"]:
+            if "_id" in p:
+                p["id"] = str(p.pop("_id"))
+    return comp
 
-        return {"list": competitions}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener competiciones: {str(e)}")
+def _encode_cursor(comp: dict) -> str:
+    raw = json.dumps([comp.get("date"), comp.get("id")], default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        date, comp_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date, comp_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+@router.get("/all")
+async def get_all_competitions(
+    request: Request,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: Literal["summary", "full"] = "full",
+    status_filter: Optional[Literal["active", "inactive", "completed", "upcoming"]] = Query(None, alias="status"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+):
+    # 🔎 Filtros del lado del servidor
+    query: dict = {}
+    if status_filter:
+        query["status"] = status_filter
+    if date_from or date_to:
+        query["date"] = {}
+        if date_from:
+            query["date"]["$gte"] = iso_utc(date_from)
+        if date_to:
+            query["date"]["$lte"] = iso_utc(date_to)
+
+    # 📄 Paginación por keyset sobre (date, id), más recientes primero
+    if cursor:
+        last_date, last_id = _decode_cursor(cursor)
+        query["$and"] = [{"$or": [
+            {"date": {"$lt": last_date}},
+            {"date": last_date, "id": {"$lt": last_id}},
+        ]}]
+
+    projection = SUMMARY_FIELDS if view == "summary" else {"_id": 0}
+    mongo_cursor = (
+        read_db["competition"].find(query, projection)
+        .sort([("date", DESCENDING), ("id", DESCENDING)])
+        .limit(limit)
+    )
+
+    if response_format == "ndjson":
+        async def stream_competitions():
+            count = 0
+            last = None
+            async for comp in mongo_cursor:
+                count += 1
+                last = comp
+                yield dumps(comp) + b"\n"
+            next_cursor = _encode_cursor(last) if last and count == limit else None
+            yield dumps({"next": next_cursor}) + b"\n"
+
+        return StreamingResponse(stream_competitions(), media_type="application/x-ndjson")
+
+    # 🗃️ Caché de respuesta por combinación de parámetros ya validados (no por la query cruda)
+    cache_key = "list?" + "&".join(str(part) for part in (
+        limit, cursor or "", view, status_filter or "",
+        iso_utc(date_from) if date_from else "", iso_utc(date_to) if date_to else "",
+    ))
+    entry = competition_cache.get(cache_key)
+    if entry is None:
+        try:
+            raw_comps = await mongo_cursor.to_list(length=limit)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener competiciones: {str(e)}")
+
+        next_cursor = _encode_cursor(raw_comps[-1]) if len(raw_comps) == limit else None
+        competitions = [_normalize_competition(comp) for comp in raw_comps]
+        entry = competition_cache.set(cache_key, {"list": competitions, "next": next_cursor}, ("competition:list",))
+
+    return cached_response(request, entry)
 
 
 @router.post("/join")
@@ -89,48 +239,114 @@ async def join_team_to_competition(
     teamCode: str = Body(...),
     competitionId: str = Body(...)
 ):
-    competition = await db["competition"].find_one({'id': competitionId})
-    if not competition:
-        raise HTTPException(status_code=404, detail="Competición no encontrada para ese usuario")
-
-    teams = competition.get("teams", [])
-    if teamCode in teams:
-        raise HTTPException(status_code=400, detail="El equipo ya está registrado")
-
-    teams.append(teamCode)
-
+    # ➕ Inscripción atómica: sin leer ni reescribir todo el arreglo de equipos
     try:
-        await db["competition"].update_one(
-            {"id": competitionId},
-            {"$set": {"teams": teams}}
+        competition = await db["competition"].find_one_and_update(
+            {"id": competitionId, "teams": {"$ne": teamCode}},
+            {"$addToSet": {"teams": teamCode}},
+            projection={"_id": 0, "teams": 1},
+            return_document=ReturnDocument.BEFORE,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al actualizar equipos: {str(e)}")
 
+    if not competition:
+        if await db["competition"].count_documents({"id": competitionId}, limit=1):
+            raise HTTPException(status_code=400, detail="El equipo ya está registrado")
+        raise HTTPException(status_code=404, detail="Competición no encontrada para ese usuario")
+
+    await events.publish(events.COMPETITION, competitionId)
+
     return {
         "message": "Equipo registrado exitosamente",
         "username": competitionId,
         "teamCode": teamCode,
-        "totalTeams": len(teams)
+        "totalTeams": len(competition.get("teams", [])) + 1
     }
 
-@router.get("/{competitionId}")
-async def get_competition_by_id(competitionId: str):
-    competition = await db["competition"].find_one({"id": competitionId})
-    if not competition:
+
+def _registration_summary(results: list[dict]) -> dict:
+    summary: dict[str, int] = {}
+    for item in results:
+        summary[item["status"]] = summary.get(item["status"], 0) + 1
+    return summary
+
+
+@router.post("/{competitionId}/join/bulk")
+async def bulk_join_competition(
+    competitionId: str,
+    request: BulkJoinRequest,
+    user: dict = Depends(get_current_user)
+):
+    # 📦 Muchos equipos ya existentes en lotes de $addToSet, con resultado por equipo
+    results = await register_teams(competitionId, request.teamCodes)
+    if results is None:
         raise HTTPException(status_code=404, detail="Competición no encontrada")
 
-    # Opcional: eliminar '_id' si no quieres exponerlo
-    competition.pop("_id", None)
+    await events.publish(events.COMPETITION, competitionId)
 
-    # Asegurar que 'date' esté como datetime
-    if "date" in competition and isinstance(competition["date"], str):
-        try:
-            competition["date"] = datetime.fromisoformat(competition["date"])
-        except Exception:
-            pass  # Si ya es datetime o falla la conversión, se deja como está
+    return {"results": results, "summary": _registration_summary(results)}
 
-    return {"competition": competition}
+
+@router.post("/{competitionId}/import")
+async def import_competition_teams(
+    competitionId: str,
+    file: UploadFile = File(..., description="CSV (teamName,avatar,color,maxMembers,members) o NDJSON"),
+    user: dict = Depends(get_current_user)
+):
+    if not await db["competition"].count_documents({"id": competitionId}, limit=1):
+        raise HTTPException(status_code=404, detail="Competición no encontrada")
+
+    try:
+        rows = parse_import(await file.read(), file.filename or "")
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Archivo inválido: {str(e)}")
+    # Se rechaza completo antes de crear nada: nunca se descartan filas en silencio
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"El archivo tiene {len(rows)} filas; el máximo es {IMPORT_MAX_ROWS}")
+
+    # 🏗️ Cada fila crea su equipo y asigna sus miembros; un fallo no afecta a las demás
+    results, user_ids = await import_teams(competitionId, rows)
+    for user_id in user_ids:
+        await invalidate_user(user_id)
+
+    await events.publish(events.COMPETITION, competitionId)
+
+    return {"results": results, "summary": _registration_summary(results)}
+
+
+@router.get("/{competitionId}")
+async def get_competition_by_id(competitionId: str, request: Request):
+    # 🧊 Congelada: respuesta aparte, sin los primeros AC logrados después del congelamiento
+    frozen = await frozen_until(competitionId) is not None
+    cache_key = f"{competitionId}:frozen" if frozen else competitionId
+    entry = competition_cache.get(cache_key)
+    if entry is None:
+        competition = await read_db["competition"].find_one({"id": competitionId})
+        if not competition:
+            raise HTTPException(status_code=404, detail="Competición no encontrada")
+
+        # Opcional: eliminar '_id' si no quieres exponerlo
+        competition.pop("_id", None)
+
+        # Asegurar que 'date' esté como datetime
+        if "date" in competition and isinstance(competition["date"], str):
+            try:
+                competition["date"] = datetime.fromisoformat(competition["date"])
+            except Exception:
+                pass  # Si ya es datetime o falla la conversión, se deja como está
+
+        if frozen and competition.get("firstBlood"):
+            # El tablero público congelado dice qué AC ocurrieron antes del congelamiento
+            board, _ = await resolve_board(competitionId)
+            competition["firstBlood"] = {
+                problem: team for problem, team in competition["firstBlood"].items()
+                if board is not None and team in board.teams and problem in board.teams[team].first_ac
+            }
+
+        entry = competition_cache.set(cache_key, {"competition": competition}, (f"competition:{competitionId}",))
+
+    return cached_response(request, entry)
 
 @router.get("/private/{competitionId}")
 async def get_competition_private(
@@ -138,12 +354,10 @@ async def get_competition_private(
     user: dict = Depends(get_current_user)
 ):
     # 🔍 Validación de competencia
-    competition = await db["competition"].find_one({"id": competitionId})
+    competition = await db["competition"].find_one({"id": competitionId}, {"_id": 0})
     if not competition:
         raise HTTPException(status_code=404, detail="Competición no encontrada")
 
-    competition.pop("_id", None)
-
     # 🗓️ Parseo robusto de fecha
     if isinstance(competition.get("date"), str):
         try:
@@ -156,138 +370,160 @@ async def get_competition_private(
     # 🧠 Validación de equipo del usuario
     team_code = user.get("teamCode")
     if team_code:
-        team = await db["teams"].find_one({"code": team_code})
+        team = await db["teams"].find_one({"code": team_code}, {"_id": 0, "teamName": 1, "avatar": 1})
         if team:
-            team.pop("_id", None)
-
-            # 👥 Miembros del equipo
-            members_cursor = db["users"].find({"teamCode": team_code})
-            members = [
-                {
-                    "id": str(member.get("_id")),
-                    "username": member.get("username"),
-                    "leetcode": member.get("leetcode")
-                }
-                async for member in members_cursor
-            ]
-
-            # 🏆 Equipos en competencia
-            team_codes = competition.get("teams", [])
-            all_teams = []
-
-            for code in team_codes:
-                team = await db["teams"].find_one({"code": code})
-                if team:
-                    all_teams.append({
-                        "code": team.get("code"),
-                        "points": team.get("points", 0)
-                    })
-
-            # 📊 Ranking con empates
-            sorted_teams = sorted(all_teams, key=lambda x: x["points"], reverse=True)
-            position = None
-            last_points = None
-            current_rank = 0
-
-            for idx, t in enumerate(sorted_teams):
-                if t["points"] != last_points:
-                    current_rank = idx + 1
-                    last_points = t["points"]
-                if t["code"] == team_code:
-                    position = current_rank
-                    break
+            # 👥 Miembros del equipo: solo los campos públicos
+            members_cursor = db["users"].find({"teamCode": team_code}, PUBLIC_MEMBER_FIELDS)
+            members = [PublicMemberView.from_doc(member) async for member in members_cursor]
+
+            # 🏆 Posición con empates desde el tablero ordenado: O(log n), sin N+1
+            # (congelado: la del tablero público, sin revelar resultados posteriores)
+            board, _ = await resolve_board(competitionId)
+            position = board.rank_of(team_code) if board else None
+            total_teams = len(board) if board else 0
+
+            # 📄 Solo los envíos del equipo en esta competencia, en orden cronológico
+            submissions, _ = await list_team_submissions(competitionId, team_code, limit=100)
+            submissions.reverse()
 
             # 📦 Datos del equipo
             team_data = {
                 "team": {
                     "name": team.get("teamName"),
                     "members": members,
-                    "submissions": team.get("submissions", []),
-                    "points": team.get("points", 0),
+                    "submissions": submissions,
+                    # Puntos de esta competencia, del mismo tablero que la posición
+                    # (team.points suma todas las competencias del equipo)
+                    "points": board.teams[team_code].points if board and team_code in board.teams else 0,
                     "ranking": position,
-                    "totalTeams": len(sorted_teams),
+                    "totalTeams": total_teams,
                     'avatar': team.get('avatar', '')
                 }
             }
 
-    # 📤 Respuesta final
-    return {
+    # 📤 Respuesta final: orjson directo, sin pasar por jsonable_encoder
+    return FastJSONResponse({
         "competition": competition,
         "team": team_data
+    })
+
+
+async def _submission_context(competitionId: str, user: dict) -> tuple[CompiledCompetition, str, int]:
+    # 👤 El usuario ya viene de get_current_user: no se vuelve a consultar
+    if not user.get("username"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no autenticado")
+
+    team_code = user.get("teamCode")
+    if not team_code:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuario no tiene equipo asignado")
+    # 🔗 Sin usuario de LeetCode el envío nunca podría verificarse: se avisa en vez de dar WA
+    if verification.VERIFY_ENABLED and not user.get("leetcode_username"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Configura tu usuario de LeetCode (PATCH /users/me) antes de enviar"
+        )
+
+    # 🔍 Competencia compilada y cacheada: sin leer el documento en cada envío
+    competition = await scoring.get_compiled(competitionId)
+    if not competition:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Competencia no encontrada")
+
+    # ⏱️ Validar y calcular tiempo desde inicio
+    if competition.start is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Fecha de competencia inválida. Debe estar en formato ISO 8601."
+        )
+    now = datetime.utcnow().replace(tzinfo=timezone.utc)
+    elapsed_seconds = int((now - competition.start).total_seconds())
+
+    return competition, team_code, elapsed_seconds
+
+
+async def _ingest(competitionId: str, competition: CompiledCompetition, team_code: str, username: str,
+                  problemId: str, elapsed_seconds: int) -> dict:
+    # 🔍 Validar problema dentro de la competencia: búsqueda O(1)
+    problem = competition.problem(problemId)
+    if not problem:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Problema no encontrado en la competencia")
+
+    # ⏳ Con verificación activa el envío queda pendiente hasta confirmarse en LeetCode
+    if verification.VERIFY_ENABLED:
+        submission = await create_pending(competitionId, team_code, username, problemId, elapsed_seconds)
+        if submission is None:
+            await _raise_not_accepted(team_code)
+        verification.notify()
+        return {
+            "problem": problemId,
+            "status": submission["status"],
+            "time": submission["time"],
+            "member": submission["member"],
+            "points": 0,
+            "penalty": 0
+        }
+
+    submission = await accept_solve(competition, team_code, username, problem, elapsed_seconds)
+    if submission is None:
+        await _raise_not_accepted(team_code)
+
+    return {
+        "problem": problemId,
+        "status": "AC",
+        "time": elapsed_seconds,
+        "member": username,
+        "points": submission["points"],
+        "penalty": submission["penalty"]
     }
 
 
+async def _raise_not_accepted(team_code: str) -> None:
+    # Solo en el camino de fallo se distingue equipo inexistente de envío repetido
+    if not await db["teams"].find_one({"code": team_code}, {"_id": 1}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Equipo no encontrado")
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="El equipo ya resolvió este problema")
+
+
 @router.post("/submission/{competitionId}/{problemId}")
 async def create_submission(
     competitionId: str,
     problemId: str,
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user_fresh)
 ):
     try:
-        # 👤 Validar usuario autenticado
-        username = user.get("username")
-        if not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no autenticado")
-
-        # 🔍 Buscar competencia
-        competition = await db["competition"].find_one({"id": competitionId})
-        if not competition:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Competencia no encontrada")
-
-        # 🔍 Validar problema dentro de la competencia
-        problem_data = next((p for p in competition.get('problems', []) if str(p.get('id', '')) == problemId), None)
-        if not problem_data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Problema no encontrado en la competencia")
-
-        # 🧮 Calcular puntos
-        difficulty = problem_data.get("difficulty")
-        points = competition.get("scoring", {}).get(difficulty, 0)
-
-        # ⏱️ Validar y calcular tiempo desde inicio
-        start_time = validate_competition_date(competition.get("date"))
-        now = datetime.utcnow().replace(tzinfo=timezone.utc)
-        elapsed_seconds = int((now - start_time).total_seconds())
-
-        # 🔎 Buscar usuario y equipo
-        user_data = await db["users"].find_one({"username": username})
-        if not user_data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
-
-        team_code = user_data.get("teamCode")
-        if not team_code:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuario no tiene equipo asignado")
-
-        team = await db["teams"].find_one({"code": team_code})
-        if not team:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Equipo no encontrado")
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
-
-    # ➕ Actualizar puntos del equipo
-    try:
-        await db["teams"].update_one(
-            {"code": team_code},
-            {
-                "$set": {"points": team.get("points", 0) + points},
-                "$push": {"submissions": Submission.model_validate(
-                    {'problem':problemId,
-                    'status':"AC",
-                    'time':elapsed_seconds,
-                    'member':username,
-                    'points':points}, strict=False
-                ).dict()}
-            }
-        )
+        competition, team_code, elapsed_seconds = await _submission_context(competitionId, user)
+        submission = await _ingest(competitionId, competition, team_code, user["username"], problemId, elapsed_seconds)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al actualizar equipo: {str(e)}")
 
+    return {"submission": submission}
+
+
+@router.post("/submission/{competitionId}")
+async def create_submissions_batch(
+    competitionId: str,
+    request: SubmissionBatchRequest,
+    user: dict = Depends(get_current_user_fresh)
+):
+    competition, team_code, elapsed_seconds = await _submission_context(competitionId, user)
+
+    async def ingest_one(problemId: str) -> dict:
+        try:
+            submission = await _ingest(competitionId, competition, team_code, user["username"], problemId, elapsed_seconds)
+            return {"problem": problemId, "ok": True, "submission": submission}
+        except HTTPException as e:
+            return {"problem": problemId, "ok": False, "status": e.status_code, "detail": e.detail}
+        except Exception as e:
+            return {"problem": problemId, "ok": False, "status": 500, "detail": str(e)}
+
+    # 📦 Problemas repetidos dentro del lote se procesan una sola vez
+    problems = list(dict.fromkeys(request.problems))
+    results = await asyncio.gather(*(ingest_one(p) for p in problems))
+
     return {
-        "submission": {
-            "problem": problemId,
-            "status": "AC",
-            "time": elapsed_seconds,
-            "member": username,
-            "points": points
-        }
+        "results": results,
+        "accepted": sum(1 for r in results if r["ok"] and r["submission"]["status"] == "AC"),
+        "points": sum(r["submission"]["points"] for r in results if r["ok"]),
+        "pending": sum(1 for r in results if r["ok"] and r["submission"]["status"] == "PENDING")
     }
-
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta, timezone
-from bson import ObjectId
-from app.database import db
+from typing import Optional
+from app.services import scoring
+from app.services.scoreboard import Scoreboard, get_scoreboard
+from app.services.broadcast import broadcaster, stream
+from app.services.serialization import FastJSONResponse, RawJSONResponse, dumps
+from app.services.snapshots import board_at, elapsed_at
 import random
 
 router = APIRouter()
 
-def format_seconds(seconds: int) -> str:
-    return str(timedelta(seconds=seconds))
-
 def get_time_remaining(start_str: str, duration_minutes: int) -> str:
     try:
         # 🕒 Parsear la fecha de inicio
@@ -34,7 +36,7 @@ def get_time_remaining(start_str: str, duration_minutes: int) -> str:
     return f"{hours:02}:{minutes:02}:{seconds:02}"
 
 
-def generate_achievements() -> list[str]:
+def generate_achievements(rng: random.Random = random) -> list[str]:
     logros_divertidos = [
         "💡-mente-brillante",        # Resolvieron con genialidad
         "🐢-pero-seguro",           # Lento pero constante
@@ -57,83 +59,104 @@ def generate_achievements() -> list[str]:
         "🧤-sin-mancharse",         # Cero penalizaciones
         "🎭-drama-y-gloria",        # ¡Qué jornada!
     ]
-    return random.sample(logros_divertidos, k=random.randint(0, 2))
+    return rng.sample(logros_divertidos, k=rng.randint(0, 2))
+
+
+def add_achievements(rows: list[dict], version: int) -> list[dict]:
+    # 🎲 Semilla por (versión, equipo): la página parcial y la tabla completa muestran los mismos logros
+    for row in rows:
+        row["achievements"] = generate_achievements(random.Random(f"{version}:{row['code']}"))
+    return rows
+
+
+async def resolve_board(competitionId: str, at: Optional[datetime] = None) -> tuple[Optional[Scoreboard], dict]:
+    # 📋 Tablero materializado: una lectura, sin ordenar por petición
+    compiled = await scoring.get_compiled(competitionId)
+    if not compiled:
+        return None, {}
+    if compiled.start is None:
+        return await get_scoreboard(competitionId), {"frozen": False}
+
+    # ⏪ Consulta histórica: snapshot más cercano + envíos posteriores
+    if at is not None:
+        elapsed = max(0, min(elapsed_at(compiled, at), compiled.duration * 60))
+        # Durante el congelamiento no se revela nada posterior al inicio del mismo
+        if compiled.is_frozen(elapsed_at(compiled)):
+            elapsed = min(elapsed, compiled.freeze_at)
+        return await board_at(competitionId, elapsed), {"frozen": False, "at": elapsed}
+
+    # 🧊 Ranking público congelado hasta que la competencia se marque como completada
+    if compiled.is_frozen(elapsed_at(compiled)):
+        return await board_at(competitionId, compiled.freeze_at), {"frozen": True, "at": compiled.freeze_at}
+
+    return await get_scoreboard(competitionId), {"frozen": False}
 
 
 @router.get("/{competitionId}")
-async def get_competition_ranking(competitionId: str):
+async def get_competition_ranking(
+    competitionId: str,
+    at: Optional[datetime] = Query(None, description="Instante (ISO 8601) del ranking a reconstruir"),
+    limit: Optional[int] = Query(None, ge=0, le=500, description="Máximo de filas desde `offset`"),
+    offset: int = Query(0, ge=0),
+    around: Optional[str] = Query(None, description="Código de equipo: sus filas vecinas van en `around`"),
+    radius: int = Query(5, ge=0, le=50, description="Filas por encima y por debajo de `around`"),
+):
     try:
-        # 🔍 Obtener competencia
-        competition = await db["competition"].find_one({"id": competitionId})
-        if not competition:
+        board, view = await resolve_board(competitionId, at)
+        if not board:
             raise HTTPException(status_code=404, detail="Competencia no encontrada")
-
-        problems = competition.get("problems", [])
-        problem_lookup = {p["id"]: p["title"] for p in problems}
-        team_codes = competition.get("teams", [])
-
-        # 🔍 Obtener todos los equipos en una sola pasada
-        teams_cursor = db["teams"].find({"code": {"$in": team_codes}})
-        teams = [team async for team in teams_cursor]
-
-        # 🔍 Obtener todos los usuarios en una sola pasada
-        users_cursor = db["users"].find({"teamCode": {"$in": team_codes}})
-        users = [user async for user in users_cursor]
-
-        rankings = []
-        solved_problems = 0
-
-        for team in teams:
-            code = team.get("code")
-            submissions = team.get("submissions", [])
-            solved_problems += len(submissions)
-            sorted_subs = sorted(submissions, key=lambda s: s.get("time", 0))
-
-            solves = len(submissions)
-            total_time = sorted_subs[-1]["time"] if solves else 0
-            total_time_str = format_seconds(total_time)
-
-            last_submission = sorted_subs[-1] if solves else None
-            second_last_time = sorted_subs[-2]["time"] if solves > 1 else 0
-            last_solve_time = format_seconds(last_submission["time"] - second_last_time) if last_submission else "00:00:00"
-            last_solve_title = problem_lookup.get(last_submission["problem"], "") if last_submission else ""
-
-            member_names = [
-                u["username"]
-                for u in users
-                if u.get("teamCode") == code
-            ]
-
-            rankings.append({
-                "id": str(team.get("_id")),
-                "name": team.get("teamName", ""),
-                "avatar": team.get("avatar", ""),
-                "color": team.get("color", "#ccc"),
-                "members": member_names,
-                "points": team.get("points", 0),
-                "solves": solves,
-                "totalTime": total_time_str,
-                "lastSolve": last_solve_title,
-                "lastSolveTime": last_solve_time,
-                "isLastSolver": False,  # se marca luego
-                "achievements": generate_achievements() 
-            })
-
-        # 🏁 Determinar quién fue el último en resolver
-        if rankings:
-            last_solver = max(rankings, key=lambda r: r["totalTime"])
-            for r in rankings:
-                r["isLastSolver"] = (r["id"] == last_solver["id"])
-
-        # 📊 Ordenar por puntos descendente, luego por tiempo ascendente
-        rankings.sort(key=lambda r: (-r["points"], r["totalTime"]))
+        if around is not None and around not in board.teams:
+            raise HTTPException(status_code=404, detail="Equipo no encontrado en la competencia")
+
+        competition = {
+            **board.summary(),
+            **view,
+            'resTime': get_time_remaining(board.date, board.duration)
+        }
+
+        if limit is None and offset == 0 and around is None:
+            # ⚡ Tabla completa: filas serializadas una vez por versión del tablero
+            ranking_json = board.serialized(
+                "ranking", lambda: dumps(add_achievements(board.window(0, len(board)), board.version))
+            )
+            return RawJSONResponse(b'{"ranking":' + ranking_json + b',"competition":' + dumps(competition) + b'}')
+
+        # 📱 Lectura parcial (top-K / alrededor de un equipo): solo las filas pedidas, O(log n + k)
+        stop = len(board) if limit is None else offset + limit
+        body = {
+            "ranking": add_achievements(board.window(offset, stop), board.version),
+            "competition": competition,
+            "page": {"offset": offset, "limit": limit, "total": len(board)},
+        }
+        if around is not None:
+            body["around"] = add_achievements(board.around(around, radius), board.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error de base de datos: {str(e)}")
 
-    return {"ranking": rankings, 'competition': {
-        'title': competition.get('title', ''),
-        'teams': len(competition.get('teams', [])),
-        'totalSolved': solved_problems,
-        'resTime': get_time_remaining(competition.get('date', ''), competition.get('duration', 0))
-    }}
+    return FastJSONResponse(body)
 
+
+@router.get("/{competitionId}/stream")
+async def stream_competition_ranking(competitionId: str):
+    # 📡 Server-Sent Events: un snapshot y luego solo las filas que cambian
+    # (congelado: el snapshot del inicio del congelamiento y ningún cambio)
+    board, _ = await resolve_board(competitionId)
+    if not board:
+        raise HTTPException(status_code=404, detail="Competencia no encontrada")
+
+    # Primero suscribirse y luego armar el snapshot, sin await entre ambos: cualquier
+    # cambio posterior al snapshot ya queda en la cola del suscriptor
+    subscriber = broadcaster.subscribe(competitionId)
+    try:
+        snapshot = board.snapshot_frame()
+    except Exception:
+        broadcaster.unsubscribe(competitionId, subscriber)
+        raise
+
+    return StreamingResponse(
+        stream(competitionId, subscriber, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,27 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from uuid import uuid4
 from bson import ObjectId
+from bson.errors import InvalidId
 from app.database import db
 from app.models_entity.teams import TeamCreateRequest, TeamCode, JoinTeamRequest
-from app.services.users import generate_unique_code
-from app.routes.auth import get_current_user
+from app.models_entity.views import MEMBER_FIELDS, TEAM_FIELDS, MemberView, TeamView
+from app.services.teams import insert_team
+from app.routes.auth import get_current_user, get_current_user_fresh, invalidate_user
+from app.services import events
+from app.services.serialization import FastJSONResponse
+from app.services.submissions import frozen_until, hidden_solves, list_team_submissions
 
 router = APIRouter()
 
 # ────────────────────────────────────────────────────────────────
 @router.post("/create")
-async def create_team(request: TeamCreateRequest, current_user: dict = Depends(get_current_user)):
+async def create_team(request: TeamCreateRequest, current_user: dict = Depends(get_current_user_fresh)):
     try:
-        # Generar código único
-        existing_codes_cursor = db["teams"].find({}, {"code": 1})
-        existing_codes_list = await existing_codes_cursor.to_list(length=None)
-        existing_codes = {team["code"] for team in existing_codes_list}
-
-        code = generate_unique_code(existing_codes)
-
         try:
             team = TeamCode.model_validate({
-                "code": code,
+                "code": "",
                 "teamName": request.teamName,
                 "avatar": request.avatar,
                 "color": request.color,
@@ -31,8 +30,9 @@ async def create_team(request: TeamCreateRequest, current_user: dict = Depends(g
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error creando el TeamCode: {str(e)}")
 
-
-        insert_result = await db["teams"].insert_one(team.dict())
+        # Código único sin leer todos los equipos: el índice único resuelve los choques
+        created_team = await insert_team(lambda code: {**team.dict(), "code": code})
+        code = created_team["code"]
         previous_code = current_user.get("teamCode")
 
         # Si tenía equipo anterior
@@ -57,8 +57,10 @@ async def create_team(request: TeamCreateRequest, current_user: dict = Depends(g
            
         # Asociar nuevo equipo al usuario
         await db["users"].update_one({"username": current_user["username"]}, {"$set": {"teamCode": code}})
+        await invalidate_user(current_user.get("_id"))
+        if previous_code:
+            await events.publish(events.TEAM, previous_code)
 
-        created_team = await db["teams"].find_one({"_id": insert_result.inserted_id})
         created_team["id"] = str(created_team.pop("_id"))  # Renombrar _id a id
 
         return {"message": "Equipo creado exitosamente", "team": created_team}
@@ -71,7 +73,7 @@ async def create_team(request: TeamCreateRequest, current_user: dict = Depends(g
 
 # ────────────────────────────────────────────────────────────────
 @router.post("/join")
-async def join_team(request: JoinTeamRequest, current_user: dict = Depends(get_current_user)):
+async def join_team(request: JoinTeamRequest, current_user: dict = Depends(get_current_user_fresh)):
     try:
         # Buscar equipo
         team = await db["teams"].find_one({"code": request.teamCode})
@@ -88,12 +90,16 @@ async def join_team(request: JoinTeamRequest, current_user: dict = Depends(get_c
         )
         if update_user.modified_count == 0:
             raise HTTPException(status_code=400, detail="No se pudo actualizar el usuario")
+        await invalidate_user(current_user.get("_id"))
 
         # Incrementar miembros del equipo
         await db["teams"].update_one(
             {"code": request.teamCode},
             {"$inc": {"currentMembers": 1}}
         )
+        await events.publish(events.TEAM, request.teamCode)
+        if current_user.get("teamCode"):
+            await events.publish(events.TEAM, current_user["teamCode"])
 
         return {"message": "Unido al equipo exitosamente", "teamCode": request.teamCode}
 
@@ -105,7 +111,7 @@ async def join_team(request: JoinTeamRequest, current_user: dict = Depends(get_c
 
 # ────────────────────────────────────────────────────────────────
 @router.delete("/delete")
-async def delete_team(current_user: dict = Depends(get_current_user)):
+async def delete_team(current_user: dict = Depends(get_current_user_fresh)):
     try:
         user = await db["users"].find_one({"username": current_user["username"]})
         if not user:
@@ -128,6 +134,9 @@ async def delete_team(current_user: dict = Depends(get_current_user)):
             {"username": current_user["username"]},
             {"$set": {"teamCode": ""}}
         )
+        await invalidate_user(current_user.get("_id"))
+        if previous_code:
+            await events.publish(events.TEAM, previous_code)
 
         return {"message": "Equipo eliminado o desvinculado"}
 
@@ -141,31 +150,47 @@ async def delete_team(current_user: dict = Depends(get_current_user)):
 @router.get("/team/{team_code}")
 async def get_team_by_code(team_code: str, current_user: dict = Depends(get_current_user)):
     try:
-        team = await db["teams"].find_one({"code": team_code})
+        team = await db["teams"].find_one({"code": team_code}, TEAM_FIELDS)
         if not team:
             raise HTTPException(status_code=404, detail="Equipo no encontrado")
 
-        members_cursor = db["users"].find({"teamCode": team_code})
-        members_list = await members_cursor.to_list(length=None)
+        # 🧊 Otro equipo: sin los AC posteriores al congelamiento de competencias congeladas
+        if current_user.get("teamCode") != team_code:
+            for solve in await hidden_solves(team_code):
+                team["points"] = team.get("points", 0) - solve.get("points", 0)
+                if solve["problem"] in team.get("solved", []):
+                    team["solved"].remove(solve["problem"])
 
-        members = [
-            {
-                "id": str(member["_id"]),
-                "username": member["username"],
-                "email": member["email"],
-            }
-            for member in members_list
-        ]
+        # 👥 Solo los campos que se devuelven, sin re-validar con pydantic
+        members_cursor = db["users"].find({"teamCode": team_code}, MEMBER_FIELDS)
+        members = [MemberView.from_doc(member) async for member in members_cursor]
 
-        team["id"] = str(team.pop("_id"))  # Renombra _id a id y lo convierte a string
-
-        return {
-            "team": TeamCode(**team),
+        return FastJSONResponse({
+            "team": TeamView.from_doc(team),
             "members": members
-        }
+        })
 
     except HTTPException as http_err:
         raise http_err
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno al obtener el equipo: {str(e)}")
 
+
+# ────────────────────────────────────────────────────────────────
+@router.get("/team/{team_code}/submissions")
+async def get_team_submissions(
+    team_code: str,
+    competitionId: str,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        # 🧊 Los envíos ajenos posteriores al congelamiento no se muestran hasta descongelar
+        until = None if current_user.get("teamCode") == team_code else await frozen_until(competitionId)
+        submissions, next_cursor = await list_team_submissions(competitionId, team_code, limit, before, until)
+        return FastJSONResponse({"submissions": submissions, "next": next_cursor})
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno al obtener los envíos: {str(e)}")
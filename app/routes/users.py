@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from pymongo.errors import PyMongoError
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from app.database import db
-from app.models_entity.users import User, RegisterRequest
+from bson import ObjectId
+from app.models_entity.users import User, RegisterRequest, ProfileUpdateRequest
 from app.models_entity.general import Token
-from app.routes.auth import (get_current_user, get_password_hash, create_access_token)
+from app.routes.auth import (get_current_user, get_password_hash, create_access_token, invalidate_user)
 
 router = APIRouter()
 
@@ -16,15 +17,20 @@ async def register_user(user: RegisterRequest):
         new_user = User.model_validate({
             "email": user.email,
             "username": user.username,
-            "password": get_password_hash(user.password)
+            "password": await get_password_hash(user.password),
+            "leetcode_username": user.leetcode_username,
         }, strict=False)
 
         result = await db["users"].insert_one(new_user.dict())
         user_id = str(result.inserted_id)
+        await invalidate_user(user_id)
 
         token = create_access_token({"sub": user.email, "id": user_id})
         return {"access_token": token, "token_type": "bearer"}
 
+    except DuplicateKeyError:
+        # Índices únicos en users.username / users.email
+        raise HTTPException(status_code=400, detail="Usuario o email ya registrado")
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Error de base de datos: {str(e)}")
 
@@ -36,3 +42,14 @@ async def get_my_info(current_user: dict = Depends(get_current_user)):
     current_user['id'] = current_user['_id']
     current_user.pop('_id', None)
     return current_user
+
+
+@router.patch("/me")
+async def update_my_profile(request: ProfileUpdateRequest, current_user: dict = Depends(get_current_user)):
+    # 🔗 Usuario de LeetCode contra el que se verifican los envíos (LEETCODE_VERIFY=true)
+    await db["users"].update_one(
+        {"_id": ObjectId(current_user["_id"])},
+        {"$set": {"leetcode_username": request.leetcode_username}}
+    )
+    await invalidate_user(current_user["_id"])
+    return {"leetcode_username": request.leetcode_username}
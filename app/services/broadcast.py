@@ -0,0 +1,92 @@
+import asyncio
+import os
+from typing import Optional
+from app.services.serialization import dumps
+
+# Tamaño de la cola por suscriptor: si un cliente lento la llena, se desaloja
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "32"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+
+def encode_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    frame = f"event: {event}\n"
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    return frame + f"data: {dumps(data).decode()}\n\n"
+
+
+class Subscriber:
+    __slots__ = ("queue", "evicted")
+
+    def __init__(self):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self.evicted = False
+
+
+class Broadcaster:
+    """Reparte un mismo frame ya serializado a todos los suscriptores de una competencia."""
+
+    def __init__(self):
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        self.published = 0
+        self.evictions = 0
+
+    def subscribe(self, competition_id: str) -> Subscriber:
+        subscriber = Subscriber()
+        self._subscribers.setdefault(competition_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, competition_id: str, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(competition_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            self._subscribers.pop(competition_id, None)
+
+    def has_subscribers(self, competition_id: str) -> bool:
+        return bool(self._subscribers.get(competition_id))
+
+    def count(self, competition_id: Optional[str] = None) -> int:
+        if competition_id is not None:
+            return len(self._subscribers.get(competition_id, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, competition_id: str, frame: str) -> None:
+        subscribers = self._subscribers.get(competition_id)
+        if not subscribers:
+            return
+
+        self.published += 1
+        for subscriber in list(subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # 🐢 Consumidor lento: se desaloja en vez de bloquear al resto
+                subscriber.evicted = True
+                self.evictions += 1
+                self.unsubscribe(competition_id, subscriber)
+
+
+broadcaster = Broadcaster()
+
+
+async def stream(competition_id: str, subscriber: Subscriber, snapshot: str):
+    # El suscriptor se registra antes de armar el snapshot (ver la ruta): así ningún
+    # cambio publicado entre el snapshot y el inicio de la respuesta se pierde
+    try:
+        yield snapshot
+        while not subscriber.evicted:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if subscriber.evicted:
+                break
+            yield frame
+
+        # El cliente debe reconectarse y recibirá un snapshot nuevo
+        yield encode_event("evicted", {"reason": "slow-consumer"})
+    finally:
+        broadcaster.unsubscribe(competition_id, subscriber)
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from fastapi import Request, Response
+from app.services.serialization import dumps
+
+
+class TTLCache:
+    """Caché LRU acotada por tamaño con expiración por entrada (por proceso)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 on_evict: Optional[Callable[[Any], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Avisa cuando una clave sale sola (vencida o desalojada), no en delete/clear
+        self.on_evict = on_evict
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            if self.on_evict is not None:
+                self.on_evict(key)
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def delete(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRatio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# ─── Backends compartidos (L2) ─────────────────────────────────────────────────
+
+class LocalBackend:
+    """Sustituto local del backend compartido: misma interfaz, vive en el proceso."""
+
+    name = "local"
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class RedisBackend:
+    """Backend compartido entre workers de gunicorn (requiere el paquete redis)."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str):
+        import redis.asyncio as redis  # dependencia opcional
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self._redis.get(self._prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        await self._redis.set(self._prefix + key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._prefix + key)
+
+
+def shared_backend(prefix: str):
+    # CACHE_BACKEND=redis + REDIS_URL comparte la caché entre workers; si no, no hay L2
+    backend = os.getenv("CACHE_BACKEND", "none").lower()
+    if backend == "redis" and os.getenv("REDIS_URL"):
+        return RedisBackend(os.environ["REDIS_URL"], prefix)
+    if backend == "local":
+        return LocalBackend()
+    return None
+
+
+class TwoLevelCache:
+    """L1 por proceso (LRU + TTL) delante de un L2 compartido opcional."""
+
+    def __init__(self, prefix: str, maxsize: int, ttl: float):
+        self.local = TTLCache(maxsize, ttl)
+        self.shared = shared_backend(prefix)
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        value = await self.shared.get(key)
+        if value is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.local.ttl)
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+    def stats(self) -> dict:
+        stats = {"local": self.local.stats(), "backend": self.shared.name if self.shared else None}
+        if self.shared is not None:
+            stats["shared"] = {"hits": self.shared_hits, "misses": self.shared_misses}
+        return stats
+
+
+# ─── Caché de respuestas con ETag ──────────────────────────────────────────────
+
+class CachedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+
+
+class ResponseCache:
+    """Cuerpos JSON ya serializados por clave, con ETag fuerte e invalidación por etiqueta."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 30.0):
+        self._cache = TTLCache(maxsize, ttl, on_evict=self._forget)
+        self._tags: dict[str, set[str]] = {}
+        self._key_tags: dict[str, tuple[str, ...]] = {}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    def set(self, key: str, content: Any, tags: tuple[str, ...] = ()) -> CachedResponse:
+        body = dumps(content)
+        entry = CachedResponse(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        self._forget(key)
+        self._cache.set(key, entry)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self._key_tags[key] = tags
+        return entry
+
+    def _forget(self, key: str) -> None:
+        # Las etiquetas solo apuntan a claves vivas: el índice queda acotado por maxsize
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tag: str) -> None:
+        for key in list(self._tags.get(tag, ())):
+            self._forget(key)
+            self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._tags.clear()
+        self._key_tags.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def cached_response(request: Request, entry: CachedResponse, max_age: int = 0) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+
+    # 🔁 GET condicional: sin consulta a la BD ni re-serialización
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+from app.services.cache import TTLCache
+from app.services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# ─── Bus de eventos entre workers ──────────────────────────────────────────────
+# Cada worker de gunicorn guarda cachés y tableros en memoria. Quien produce un
+# cambio lo aplica en su proceso y lo publica; los demás workers lo reciben y
+# aplican los mismos handlers. Los handlers deben ser idempotentes: un evento
+# puede llegar repetido (reconexiones) o después de que el worker ya recargó.
+#
+#   EVENT_BUS=local  → un solo proceso, sin transporte (por defecto)
+#   EVENT_BUS=mongo  → change stream sobre la colección `events` (requiere réplica / Cosmos)
+#   EVENT_BUS=redis  → pub/sub de Redis en REDIS_URL (requiere el paquete redis)
+EVENT_BUS = os.getenv("EVENT_BUS", "local").lower()
+EVENTS_COLLECTION = "events"
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "code-arena:events")
+EVENT_RETRY_MAX = float(os.getenv("EVENT_RETRY_MAX", "30"))
+
+# Eventos conocidos: quién los publica y qué invalida cada worker al recibirlos
+COMPETITION = "competition"  # data: id de competencia (None = solo el listado)
+TEAM = "team"                # data: código de equipo cuya membresía cambió
+USER = "user"                # data: id de usuario
+SOLVE = "solve"              # data: primer AC aceptado (se aplica al tablero en memoria)
+
+_handlers: dict[str, list[Callable[[Any], None]]] = {}
+_seen = TTLCache(maxsize=10000, ttl=300)
+_instance = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+
+
+def origin() -> str:
+    # Incluye el pid: con --preload los workers comparten lo creado al importar
+    return f"{_instance}:{os.getpid()}"
+
+
+def subscribe(kind: str, handler: Callable[[Any], None]) -> None:
+    _handlers.setdefault(kind, []).append(handler)
+
+
+def apply(event: dict) -> None:
+    for handler in _handlers.get(event["kind"], ()):
+        try:
+            handler(event["data"])
+        except Exception:
+            logger.exception("Falló el handler de %s", event["kind"])
+
+
+def deliver(event: dict) -> None:
+    # Eventos recibidos del transporte: se ignoran los propios y los repetidos
+    if event.get("origin") == origin() or _seen.get(event["id"]) is not None:
+        return
+    _seen.set(event["id"], True)
+    apply(event)
+
+
+async def publish(kind: str, data: Any = None) -> None:
+    event = {"id": uuid.uuid4().hex, "origin": origin(), "kind": kind, "data": data,
+             "at": datetime.now(timezone.utc)}
+    # ⚡ Primero en este proceso: quien hizo el cambio lo ve de inmediato
+    apply(event)
+    if _bus is None:
+        return
+    try:
+        await _bus.send(event)
+    except Exception as e:
+        # El cambio ya está en Mongo; los demás workers se corrigen al vencer sus TTL
+        # (los tableros, a los SCOREBOARD_BUS_TTL segundos)
+        logger.warning("No se pudo publicar el evento %s: %s", kind, e)
+
+
+# ─── Transportes ───────────────────────────────────────────────────────────────
+
+class MongoBus:
+    """Eventos como inserciones en `events`, leídas por cada worker con un change stream."""
+
+    name = "mongo"
+
+    async def send(self, event: dict) -> None:
+        from app.database import db
+
+        await db[EVENTS_COLLECTION].insert_one(dict(event))
+
+    async def listen(self) -> None:
+        from app.database import db
+
+        # Cosmos DB exige operationType + $project explícitos en el pipeline
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert"]}}},
+            {"$project": {"_id": 1, "fullDocument": 1, "ns": 1, "documentKey": 1}},
+        ]
+        resume_token = None
+        failures = 0
+        while True:
+            try:
+                async with db[EVENTS_COLLECTION].watch(pipeline, full_document="updateLookup",
+                                                       resume_after=resume_token) as stream:
+                    failures = 0
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        if change.get("fullDocument"):
+                            deliver(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                delay = min(EVENT_RETRY_MAX, 2 ** failures) * (0.5 + random.random() / 2)
+                logger.warning("Change stream de eventos caído (%s); reintento en %.1fs", e, delay)
+                await asyncio.sleep(delay)
+
+
+class RedisBus:
+    """Pub/sub de Redis: un canal compartido por todos los workers."""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # dependencia opcional
+
+        self._redis = redis.from_url(url)
+
+    async def send(self, event: dict) -> None:
+        await self._redis.publish(EVENTS_CHANNEL, dumps(event))
+
+    async def listen(self) -> None:
+        failures = 0
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(EVENTS_CHANNEL)
+                    failures = 0
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            deliver(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                delay = min(EVENT_RETRY_MAX, 2 ** failures) * (0.5 + random.random() / 2)
+                logger.warning("Suscripción de eventos en Redis caída (%s); reintento en %.1fs", e, delay)
+                await asyncio.sleep(delay)
+
+
+def _make_bus():
+    if EVENT_BUS == "mongo":
+        return MongoBus()
+    if EVENT_BUS == "redis" and os.getenv("REDIS_URL"):
+        return RedisBus(os.environ["REDIS_URL"])
+    if EVENT_BUS not in ("local", "redis"):
+        raise RuntimeError(f"EVENT_BUS inválido: {EVENT_BUS} (opciones: local, mongo, redis)")
+    return None
+
+
+_bus: Optional[Any] = _make_bus()
+
+
+def has_transport() -> bool:
+    return _bus is not None
+
+
+async def run_event_listener() -> None:
+    # 📡 Tarea de fondo del lifespan; sin transporte no hay nada que escuchar
+    if _bus is None:
+        return
+    logger.info("Bus de eventos %s escuchando como %s", _bus.name, origin())
+    await _bus.listen()
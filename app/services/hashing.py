@@ -0,0 +1,84 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app.services.metrics import registry
+
+# bcrypt libera el GIL, así que un pool de hilos basta para sacarlo del event loop
+HASH_CONCURRENCY = int(os.getenv("HASH_CONCURRENCY", "2"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_executor = ThreadPoolExecutor(max_workers=HASH_CONCURRENCY, thread_name_prefix="bcrypt")
+_semaphore: asyncio.Semaphore | None = None
+
+
+class HashMetrics:
+    def __init__(self):
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "concurrency": HASH_CONCURRENCY,
+            "inFlight": self.in_flight,
+            "queued": self.queued,
+            "maxQueued": self.max_queued,
+            "completed": self.completed,
+            "avgWaitMs": round(self.wait_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            "avgRunMs": round(self.run_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+
+metrics = HashMetrics()
+
+
+def collect_metrics() -> list[tuple]:
+    # 📊 Colector de /metrics (ver app/services/metrics.py)
+    return [
+        ("password_hash_concurrency", "gauge", "Hilos disponibles para bcrypt.", [({}, HASH_CONCURRENCY)]),
+        ("password_hash_in_flight", "gauge", "Hashes ejecutándose.", [({}, metrics.in_flight)]),
+        ("password_hash_queued", "gauge", "Hashes esperando un hilo.", [({}, metrics.queued)]),
+        ("password_hash_max_queued", "gauge", "Máximo de hashes en espera observado.", [({}, metrics.max_queued)]),
+        ("password_hash_completed_total", "counter", "Hashes completados.", [({}, metrics.completed)]),
+        ("password_hash_wait_seconds_total", "counter", "Tiempo acumulado en cola.", [({}, metrics.wait_seconds)]),
+        ("password_hash_run_seconds_total", "counter", "Tiempo acumulado calculando hashes.", [({}, metrics.run_seconds)]),
+    ]
+
+
+registry.register_collector(collect_metrics)
+
+
+async def _run(fn, *args):
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(HASH_CONCURRENCY)
+
+    # ⏳ Cola acotada: como mucho HASH_CONCURRENCY hashes a la vez por worker
+    metrics.queued += 1
+    metrics.max_queued = max(metrics.max_queued, metrics.queued)
+    enqueued = time.perf_counter()
+    async with _semaphore:
+        metrics.queued -= 1
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+        finally:
+            finished = time.perf_counter()
+            metrics.in_flight -= 1
+            metrics.completed += 1
+            metrics.wait_seconds += started - enqueued
+            metrics.run_seconds += finished - started
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
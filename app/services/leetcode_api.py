@@ -0,0 +1,124 @@
+import asyncio
+import os
+import random
+from typing import Optional
+import httpx
+from app.services.cache import TTLCache
+
+# LEETCODE_URL permite apuntar a un servidor falso local (scripts/fake_leetcode.py)
+LEETCODE_URL = os.getenv("LEETCODE_URL", "https://leetcode.com").rstrip("/")
+LEETCODE_CONCURRENCY = int(os.getenv("LEETCODE_CONCURRENCY", "4"))
+LEETCODE_TIMEOUT = float(os.getenv("LEETCODE_TIMEOUT", "10"))
+LEETCODE_RETRIES = int(os.getenv("LEETCODE_RETRIES", "4"))
+LEETCODE_BACKOFF = float(os.getenv("LEETCODE_BACKOFF", "0.5"))
+# Usuarios por consulta GraphQL (un alias por usuario)
+LEETCODE_BATCH_USERS = int(os.getenv("LEETCODE_BATCH_USERS", "10"))
+LEETCODE_RECENT_LIMIT = int(os.getenv("LEETCODE_RECENT_LIMIT", "20"))
+
+_recent_cache = TTLCache(maxsize=10000, ttl=float(os.getenv("LEETCODE_CACHE_TTL", "30")))
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class LeetCodeError(Exception):
+    pass
+
+
+def get_client() -> httpx.AsyncClient:
+    # 🔌 Un solo pool de conexiones keep-alive para todo el proceso
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=LEETCODE_URL,
+            timeout=LEETCODE_TIMEOUT,
+            limits=httpx.Limits(max_connections=LEETCODE_CONCURRENCY, max_keepalive_connections=LEETCODE_CONCURRENCY),
+            headers={"Content-Type": "application/json", "Referer": LEETCODE_URL},
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LEETCODE_CONCURRENCY)
+    return _semaphore
+
+
+async def graphql(query: str, variables: dict) -> dict:
+    # 🔁 Reintentos con backoff exponencial y jitter completo ante 429/5xx o fallos de red
+    last_error: Exception = LeetCodeError("Sin intentos")
+    for attempt in range(LEETCODE_RETRIES):
+        if attempt:
+            await asyncio.sleep(random.uniform(0, LEETCODE_BACKOFF * 2 ** attempt))
+        try:
+            async with _get_semaphore():
+                response = await get_client().post("/graphql", json={"query": query, "variables": variables})
+        except httpx.TransportError as e:
+            last_error = e
+            continue
+
+        if response.status_code == 429 or response.status_code >= 500:
+            last_error = LeetCodeError(f"LeetCode respondió {response.status_code}")
+            continue
+        if response.status_code != 200:
+            raise LeetCodeError(f"LeetCode respondió {response.status_code}")
+
+        payload = response.json()
+        if payload.get("errors") and not payload.get("data"):
+            raise LeetCodeError(payload["errors"][0].get("message", "Error de GraphQL"))
+        return payload.get("data") or {}
+    raise last_error
+
+
+def _recent_query(count: int) -> str:
+    # Un alias por usuario: N usuarios en una sola petición
+    params = ", ".join(f"$u{i}: String!" for i in range(count))
+    fields = " ".join(
+        f"u{i}: recentAcSubmissionList(username: $u{i}, limit: $limit) {{ titleSlug timestamp }}"
+        for i in range(count)
+    )
+    return f"query recentAc({params}, $limit: Int!) {{ {fields} }}"
+
+
+async def _fetch_recent(usernames: list[str]) -> dict[str, list[dict]]:
+    variables: dict = {f"u{i}": name for i, name in enumerate(usernames)}
+    variables["limit"] = LEETCODE_RECENT_LIMIT
+    data = await graphql(_recent_query(len(usernames)), variables)
+    return {name: data.get(f"u{i}") or [] for i, name in enumerate(usernames)}
+
+
+async def recent_accepted(usernames: list[str]) -> dict[str, list[dict]]:
+    """Últimos AC por usuario de LeetCode ([{"titleSlug", "timestamp"}]); omite los que fallaron."""
+    result: dict[str, list[dict]] = {}
+    missing: list[str] = []
+    for name in dict.fromkeys(usernames):
+        cached = _recent_cache.get(name)
+        if cached is None:
+            missing.append(name)
+        else:
+            result[name] = cached
+
+    batches = [missing[i:i + LEETCODE_BATCH_USERS] for i in range(0, len(missing), LEETCODE_BATCH_USERS)]
+    for fetched in await asyncio.gather(*(_fetch_recent(batch) for batch in batches), return_exceptions=True):
+        # Un lote fallido no tumba a los demás: sus usuarios quedan fuera y se reintentan luego
+        if isinstance(fetched, Exception):
+            continue
+        for name, submissions in fetched.items():
+            _recent_cache.set(name, submissions)
+            result[name] = submissions
+    return result
+
+
+def invalidate_recent(username: str) -> None:
+    _recent_cache.delete(username)
+
+
+def stats() -> dict:
+    return {"recentCache": _recent_cache.stats()}
@@ -0,0 +1,309 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+from pymongo import monitoring
+
+# Métricas por proceso en formato de texto de Prometheus (cada worker de
+# gunicorn expone las suyas; Prometheus las agrega por instancia).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    """Viajes a Mongo de una petición; lo comparten los hilos del executor de Motor."""
+
+    __slots__ = ("round_trips", "db_seconds", "documents", "_lock")
+
+    def __init__(self):
+        self.round_trips = 0
+        self.db_seconds = 0.0
+        self.documents = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float, documents: int) -> None:
+        with self._lock:
+            self.round_trips += 1
+            self.db_seconds += seconds
+            self.documents += documents
+
+
+# Motor ejecuta pymongo en un executor que copia el contexto: el listener ve la petición
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("current_request", default=None)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.requests: dict[tuple[str, str, str], int] = {}
+        self.round_trips: dict[tuple[str, str], Histogram] = {}
+        self.db_seconds: dict[tuple[str, str], float] = {}
+        self.documents: dict[tuple[str, str], int] = {}
+        self.commands: dict[tuple[str, str], int] = {}
+        self.command_seconds: dict[str, float] = {}
+        self.pool = PoolStats()
+        self._collectors: list[Callable[[], list[tuple]]] = []
+
+    def register_collector(self, collect: Callable[[], list[tuple]]) -> None:
+        # Otros módulos exponen sus contadores sin que este importe nada de ellos:
+        # `collect` devuelve (nombre, tipo, ayuda, [(etiquetas, valor), ...]) al renderizar
+        self._collectors.append(collect)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            status_key = (method, route, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.round_trips.setdefault(key, Histogram(ROUND_TRIP_BUCKETS)).observe(stats.round_trips)
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + stats.db_seconds
+            self.documents[key] = self.documents.get(key, 0) + stats.documents
+
+    def observe_command(self, command: str, outcome: str, seconds: float) -> None:
+        with self._lock:
+            key = (command, outcome)
+            self.commands[key] = self.commands.get(key, 0) + 1
+            self.command_seconds[command] = self.command_seconds.get(command, 0.0) + seconds
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in values.items()) + "}"
+
+        def histogram(name: str, help_text: str, data: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(data.items()):
+                base = dict(zip(label_names, key))
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{labels(**base, le=_number(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{labels(**base, le='+Inf')} {hist.count}")
+                lines.append(f"{name}_sum{labels(**base)} {_number(hist.sum)}")
+                lines.append(f"{name}_count{labels(**base)} {hist.count}")
+
+        def counter(name: str, help_text: str, data: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(data.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f"{name}{labels(**dict(zip(label_names, key)))} {_number(value)}")
+
+        with self._lock:
+            histogram("http_request_duration_seconds", "Latencia de las peticiones por ruta.",
+                      self.latency, ("method", "route"))
+            counter("http_requests_total", "Peticiones por ruta y código de estado.",
+                    self.requests, ("method", "route", "status"))
+            histogram("mongo_round_trips_per_request", "Comandos enviados a Mongo por petición.",
+                      self.round_trips, ("method", "route"))
+            counter("mongo_request_duration_seconds_total", "Tiempo en Mongo acumulado por ruta.",
+                    self.db_seconds, ("method", "route"))
+            counter("mongo_documents_returned_total", "Documentos devueltos por Mongo por ruta.",
+                    self.documents, ("method", "route"))
+            counter("mongo_commands_total", "Comandos de Mongo por tipo y resultado.",
+                    self.commands, ("command", "outcome"))
+            counter("mongo_command_duration_seconds_total", "Tiempo acumulado por tipo de comando.",
+                    self.command_seconds, ("command",))
+
+        pool = self.pool.snapshot()
+        for name, kind, help_text in POOL_METRICS:
+            lines.append(f"# HELP mongo_pool_{name} {help_text}")
+            lines.append(f"# TYPE mongo_pool_{name} {kind}")
+            lines.append(f"mongo_pool_{name} {_number(pool[name])}")
+
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for sample_labels, value in samples:
+                    lines.append(f"{name}{labels(**sample_labels) if sample_labels else ''} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+POOL_METRICS = (
+    ("open", "gauge", "Conexiones abiertas en el pool."),
+    ("in_use", "gauge", "Conexiones prestadas a una operación."),
+    ("created_total", "counter", "Conexiones creadas."),
+    ("closed_total", "counter", "Conexiones cerradas."),
+    ("checkouts_total", "counter", "Préstamos de conexión completados."),
+    ("checkout_failures_total", "counter", "Préstamos fallidos (timeout o pool cerrado)."),
+    ("checkout_wait_seconds_total", "counter", "Tiempo acumulado esperando una conexión."),
+)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.created - self.closed,
+                "in_use": self.in_use,
+                "created_total": self.created,
+                "closed_total": self.closed,
+                "checkouts_total": self.checkouts,
+                "checkout_failures_total": self.checkout_failures,
+                "checkout_wait_seconds_total": round(self.checkout_wait, 6),
+            }
+
+
+registry = Registry()
+
+
+# ─── Listener de comandos de pymongo ───────────────────────────────────────────
+
+def _returned_documents(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if isinstance(reply.get("value"), dict):  # findAndModify
+        return 1
+    return 0
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        seconds = event.duration_micros / 1_000_000
+        registry.observe_command(event.command_name, "ok", seconds)
+        stats = current_request.get()
+        if stats is not None:
+            stats.add(seconds, _returned_documents(event.reply))
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        seconds = event.duration_micros / 1_000_000
+        registry.observe_command(event.command_name, "error", seconds)
+        stats = current_request.get()
+        if stats is not None:
+            stats.add(seconds, 0)
+
+
+command_listener = CommandMetrics()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Estado del pool de conexiones (todas las direcciones del cliente)."""
+
+    def _update(self, **delta) -> None:
+        stats = registry.pool
+        with stats._lock:
+            for name, value in delta.items():
+                setattr(stats, name, getattr(stats, name) + value)
+
+    def connection_created(self, event) -> None:
+        self._update(created=1)
+
+    def connection_closed(self, event) -> None:
+        self._update(closed=1)
+
+    def connection_checked_out(self, event) -> None:
+        self._update(in_use=1, checkouts=1, checkout_wait=getattr(event, "duration", 0.0))
+
+    def connection_checked_in(self, event) -> None:
+        self._update(in_use=-1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._update(checkout_failures=1, checkout_wait=getattr(event, "duration", 0.0))
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+
+pool_listener = PoolMetrics()
+
+
+# ─── Middleware ASGI ───────────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """Latencia por plantilla de ruta + viajes a Mongo; añade Server-Timing a la respuesta."""
+
+    def __init__(self, app, skip_paths: tuple[str, ...] = ("/metrics", "/metrics/pool")):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                # ⏱️ Viajes a la BD visibles desde el navegador (DevTools → Timing)
+                headers.append((b"server-timing", (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.round_trips} round trips"'
+                ).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            registry.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Optional
+from app.services import leetcode_api
+
+logger = logging.getLogger(__name__)
+
+# Catálogo local de problemas de LeetCode en SQLite: compartido por los workers
+# de gunicorn, sobrevive reinicios y se consulta por slug sin ir a la red. Por
+# defecto en el directorio temporal: el de trabajo del contenedor no es escribible
+# por el usuario de la app (montar un volumen y apuntar PROBLEM_CATALOG_PATH ahí).
+PROBLEM_CATALOG_PATH = os.getenv(
+    "PROBLEM_CATALOG_PATH", os.path.join(tempfile.gettempdir(), "code_arena_problem_catalog.sqlite3")
+)
+PROBLEM_CATALOG_TTL = int(os.getenv("PROBLEM_CATALOG_TTL", str(24 * 3600)))
+PROBLEM_CATALOG_PAGE = int(os.getenv("PROBLEM_CATALOG_PAGE", "100"))
+
+SLUG_FROM_URL = re.compile(r"/problems/([a-z0-9-]+)")
+
+QUESTION_LIST_QUERY = """
+query problemsetQuestionList($limit: Int!, $skip: Int!) {
+  problemsetQuestionList: questionList(categorySlug: "", limit: $limit, skip: $skip, filters: {}) {
+    total: totalNum
+    questions: data { questionFrontendId title titleSlug difficulty paidOnly: isPaidOnly }
+  }
+}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogProblem:
+    slug: str
+    title: str
+    difficulty: str  # easy | medium | hard
+    frontend_id: str
+    paid_only: bool
+
+
+_conn: Optional[sqlite3.Connection] = None
+
+
+def _open() -> sqlite3.Connection:
+    conn = sqlite3.connect(PROBLEM_CATALOG_PATH, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS problems ("
+        " slug TEXT PRIMARY KEY, title TEXT NOT NULL, difficulty TEXT NOT NULL,"
+        " frontend_id TEXT, paid_only INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+
+def _connect() -> sqlite3.Connection:
+    # Conexión de lectura del event loop; la escritura usa la suya propia (WAL)
+    global _conn
+    if _conn is None:
+        _conn = _open()
+    return _conn
+
+
+def slug_of(slug: Optional[str], url: Optional[str] = None) -> str:
+    if slug:
+        return slug.strip().lower()
+    match = SLUG_FROM_URL.search(str(url or ""))
+    return match.group(1) if match else ""
+
+
+def lookup(slug: str) -> Optional[CatalogProblem]:
+    # 🔎 Búsqueda por clave primaria: microsegundos, sin viaje de red
+    row = _connect().execute(
+        "SELECT slug, title, difficulty, frontend_id, paid_only FROM problems WHERE slug = ?", (slug,)
+    ).fetchone()
+    return CatalogProblem(row[0], row[1], row[2], row[3], bool(row[4])) if row else None
+
+
+def refreshed_at() -> Optional[float]:
+    try:
+        row = _connect().execute("SELECT value FROM meta WHERE key = 'refreshed_at'").fetchone()
+    except sqlite3.Error as e:
+        # Sin acceso al archivo el catálogo cuenta como no descargado: nunca tumba la petición
+        logger.warning("Catálogo de problemas no disponible en %s: %s", PROBLEM_CATALOG_PATH, e)
+        return None
+    return float(row[0]) if row else None
+
+
+def is_loaded() -> bool:
+    return refreshed_at() is not None
+
+
+def is_stale() -> bool:
+    last = refreshed_at()
+    return last is None or time.time() - last > PROBLEM_CATALOG_TTL
+
+
+def _store(rows: list[tuple]) -> None:
+    conn = _open()
+    # Reemplazo completo en una sola transacción: los lectores ven el catálogo viejo o el nuevo
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM problems")
+            conn.executemany("INSERT OR REPLACE INTO problems VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('refreshed_at', ?)", (str(time.time()),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+
+async def _fetch_page(skip: int) -> dict:
+    data = await leetcode_api.graphql(QUESTION_LIST_QUERY, {"limit": PROBLEM_CATALOG_PAGE, "skip": skip})
+    return data.get("problemsetQuestionList") or {}
+
+
+async def refresh() -> int:
+    # 📥 Primera página para conocer el total; el resto en paralelo (acotado por el cliente)
+    first = await _fetch_page(0)
+    total = int(first.get("total") or 0)
+    pages = [first] + list(await asyncio.gather(
+        *(_fetch_page(skip) for skip in range(PROBLEM_CATALOG_PAGE, total, PROBLEM_CATALOG_PAGE))
+    ))
+
+    rows = [
+        (q["titleSlug"], q["title"], str(q["difficulty"]).lower(), str(q.get("questionFrontendId", "")),
+         int(bool(q.get("paidOnly"))))
+        for page in pages for q in page.get("questions") or []
+    ]
+    if not rows:
+        raise leetcode_api.LeetCodeError("El catálogo de LeetCode llegó vacío")
+
+    await asyncio.to_thread(_store, rows)
+    logger.info("Catálogo de problemas actualizado: %d problemas", len(rows))
+    return len(rows)
+
+
+async def run_catalog_refresher() -> None:
+    # 🔄 Refresco en segundo plano cuando el catálogo vence; nunca en el camino de la petición
+    while True:
+        if is_stale():
+            try:
+                await refresh()
+            except Exception:
+                logger.exception("No se pudo actualizar el catálogo de problemas")
+        await asyncio.sleep(min(PROBLEM_CATALOG_TTL, 3600))
+
+
+if __name__ == "__main__":
+    async def main():
+        try:
+            print(f"{await refresh()} problemas en {PROBLEM_CATALOG_PATH}")
+        finally:
+            await leetcode_api.close_client()
+
+    asyncio.run(main())
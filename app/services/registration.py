@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import os
+from typing import Iterable, Optional
+from pydantic import ValidationError
+from app.database import db
+from app.models_entity.teams import TeamCode, TeamImportRow
+from app.services.teams import insert_team
+
+# Tamaño de lote para $addToSet/$each y bulk_write (acota el tamaño de cada comando)
+REGISTRATION_BATCH_SIZE = int(os.getenv("REGISTRATION_BATCH_SIZE", "500"))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "1000"))
+
+
+def _batches(items: list, size: int = REGISTRATION_BATCH_SIZE) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def register_teams(competition_id: str, team_codes: list[str]) -> Optional[list[dict]]:
+    # 🔎 Un solo recorrido para clasificar: equipos inexistentes y ya inscritos
+    competition = await db["competition"].find_one({"id": competition_id}, {"_id": 0, "teams": 1})
+    if competition is None:
+        return None
+    registered = set(competition.get("teams") or [])
+
+    codes = list(dict.fromkeys(team_codes))
+    existing: set[str] = set()
+    for batch in _batches(codes):
+        found = await db["teams"].find({"code": {"$in": batch}}, {"_id": 0, "code": 1}).to_list(length=None)
+        existing.update(t["code"] for t in found)
+
+    to_add = [code for code in codes if code in existing and code not in registered]
+
+    # ➕ $addToSet es idempotente: inscripciones concurrentes no se pisan ni duplican
+    for batch in _batches(to_add):
+        await db["competition"].update_one({"id": competition_id}, {"$addToSet": {"teams": {"$each": batch}}})
+
+    results = []
+    for code in codes:
+        if code not in existing:
+            results.append({"teamCode": code, "status": "not_found"})
+        elif code in registered:
+            results.append({"teamCode": code, "status": "already_registered"})
+        else:
+            results.append({"teamCode": code, "status": "registered"})
+    return results
+
+
+# ─── Importación de equipos (CSV / NDJSON) ─────────────────────────────────────
+
+def parse_import(content: bytes, filename: str = "") -> list[dict | str]:
+    """Filas del archivo como dicts; las líneas ilegibles quedan como mensaje de error."""
+    text = content.decode("utf-8-sig")
+    rows: list[dict | str] = []
+
+    if filename.endswith((".ndjson", ".jsonl")) or text.lstrip().startswith("{"):
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                rows.append(f"JSON inválido: {e.msg}")
+    else:
+        # CSV con cabecera: teamName,avatar,color,maxMembers,members (miembros separados por ';')
+        for row in csv.DictReader(io.StringIO(text)):
+            members = row.get("members") or ""
+            row["members"] = [m.strip() for m in members.split(";") if m.strip()]
+            rows.append({k: v for k, v in row.items() if v not in (None, "")})
+    return rows
+
+
+async def import_team(row: TeamImportRow) -> tuple[dict, list]:
+    team = TeamCode.model_validate({
+        "code": "",
+        "teamName": row.teamName,
+        "avatar": row.avatar,
+        "color": row.color,
+        "maxMembers": row.maxMembers,
+        "currentMembers": 0,
+    })
+    created = await insert_team(lambda code: {**team.dict(), "code": code})
+    code = created["code"]
+
+    # 👥 Solo se asignan usuarios sin equipo; el filtro evita robar miembros a otro equipo
+    members = list(dict.fromkeys(row.members))[:row.maxMembers]
+    try:
+        assigned = []
+        if members:
+            await db["users"].update_many(
+                {"username": {"$in": members}, "teamCode": {"$in": [None, ""]}},
+                {"$set": {"teamCode": code}}
+            )
+            assigned = await db["users"].find(
+                {"username": {"$in": members}, "teamCode": code}, {"_id": 1, "username": 1}
+            ).to_list(length=None)
+            await db["teams"].update_one({"code": code}, {"$set": {"currentMembers": len(assigned)}})
+    except Exception:
+        # ↩️ Todo o nada por equipo: se deshace la asignación y el equipo creado
+        await db["users"].update_many({"teamCode": code}, {"$set": {"teamCode": None}})
+        await db["teams"].delete_one({"code": code})
+        raise
+
+    names = {user["username"] for user in assigned}
+    return {
+        "teamCode": code,
+        "teamName": row.teamName,
+        "members": [m for m in members if m in names],
+        "skippedMembers": [m for m in row.members if m not in names],
+    }, [user["_id"] for user in assigned]
+
+
+async def import_teams(competition_id: str, rows: list[dict | str]) -> tuple[list[dict], list]:
+    results: list[dict] = []
+    user_ids: list = []
+    created: list[str] = []
+
+    for line, raw in enumerate(rows, start=1):
+        if isinstance(raw, str):
+            results.append({"line": line, "status": "invalid", "error": raw})
+            continue
+        try:
+            row = TeamImportRow.model_validate(raw)
+        except ValidationError as e:
+            results.append({"line": line, "status": "invalid", "error": e.errors()[0]["msg"]})
+            continue
+
+        try:
+            item, ids = await import_team(row)
+        except Exception as e:
+            results.append({"line": line, "status": "error", "error": str(e)})
+            continue
+
+        results.append({"line": line, "status": "registered", **item})
+        user_ids.extend(ids)
+        created.append(item["teamCode"])
+
+    for batch in _batches(created):
+        await db["competition"].update_one({"id": competition_id}, {"$addToSet": {"teams": {"$each": batch}}})
+    return results, user_ids
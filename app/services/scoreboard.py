@@ -0,0 +1,475 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Optional
+from sortedcontainers import SortedList
+from app.database import db
+from app.services import events, scoring
+from app.services.broadcast import broadcaster, encode_event
+
+logger = logging.getLogger(__name__)
+
+# Cómo se arma el tablero al cargarlo: "python" (lecturas separadas y cruce en el
+# proceso) o "aggregate" (una sola agregación en Mongo)
+RANKING_ENGINE = os.getenv("RANKING_ENGINE", "python").lower()
+
+# Antigüedad máxima de un tablero cargado. Sin transporte entre workers
+# (EVENT_BUS=local) un AC aceptado en otro worker solo llega al recargar, así que
+# se recarga seguido; con transporte es solo una red por si se pierde un evento.
+SCOREBOARD_TTL = float(os.getenv("SCOREBOARD_TTL", "5"))
+SCOREBOARD_BUS_TTL = float(os.getenv("SCOREBOARD_BUS_TTL", "300"))
+
+
+def format_seconds(seconds: int) -> str:
+    return str(timedelta(seconds=seconds))
+
+
+@dataclass(slots=True)
+class TeamStanding:
+    code: str
+    id: str
+    name: str
+    avatar: str
+    color: str
+    members: list[str] = field(default_factory=list)
+    points: int = 0
+    solves: int = 0
+    penalty: int = 0
+    last_time: int = 0
+    prev_time: int = 0
+    last_problem: str = ""
+    first_ac: dict[str, int] = field(default_factory=dict)
+
+    def sort_key(self) -> tuple:
+        # Puntos desc, penalización asc, último AC asc; el código desempata de forma estable
+        return (-self.points, self.penalty, self.last_time, self.code)
+
+
+class Scoreboard:
+    """Proyección en memoria del ranking de una competencia.
+
+    Se construye una sola vez desde Mongo y luego se actualiza en O(log n)
+    por cada envío aceptado; leerla no requiere ordenar nada. Todos los
+    tiempos se guardan en segundos enteros para que el orden sea numérico.
+    """
+
+    def __init__(self, competition_id: str, title: str, date: str, duration: int,
+                 problem_titles: dict[str, str], registered: int, penalty_mode: bool = False,
+                 freeze_at: Optional[int] = None):
+        self.competition_id = competition_id
+        self.title = title
+        self.date = date
+        self.duration = duration
+        self.problem_titles = problem_titles
+        self.registered = registered
+        self.penalty_mode = penalty_mode
+        self.freeze_at = freeze_at
+        self.teams: dict[str, TeamStanding] = {}
+        self.total_solved = 0
+        self.last_solver: Optional[str] = None
+        self.version = 0
+        self._order = SortedList()
+        self._snapshot: Optional[tuple[int, str]] = None
+        self._serialized: dict[str, tuple[int, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def add_team(self, standing: TeamStanding) -> None:
+        self.teams[standing.code] = standing
+        self._order.add(standing.sort_key())
+        self.total_solved += standing.solves
+        self._update_last_solver(standing)
+
+    def record(self, team_code: str, problem_id: str, time: int, points: int, penalty: int = 0) -> list[str]:
+        standing = self.teams.get(team_code)
+        # Idempotente: un segundo AC del mismo problema no cambia nada
+        if standing is None or problem_id in standing.first_ac:
+            return []
+        previous_last_solver = self.last_solver
+
+        # ♻️ Sacar la llave vieja, mutar y reinsertar: O(log n)
+        self._order.remove(standing.sort_key())
+        standing.points += points
+        standing.solves += 1
+        standing.penalty += penalty
+        standing.first_ac[problem_id] = time
+        if time >= standing.last_time:
+            standing.prev_time = standing.last_time
+            standing.last_time = time
+            standing.last_problem = problem_id
+        self._order.add(standing.sort_key())
+
+        self.total_solved += 1
+        self._update_last_solver(standing)
+        self.version += 1
+
+        # Filas que cambiaron: el equipo y quien deja de ser el último en resolver
+        changed = [team_code]
+        if previous_last_solver and previous_last_solver != self.last_solver:
+            changed.append(previous_last_solver)
+        return changed
+
+    def _update_last_solver(self, standing: TeamStanding) -> None:
+        if not standing.solves:
+            return
+        current = self.teams.get(self.last_solver) if self.last_solver else None
+        if current is None or standing.last_time >= current.last_time:
+            self.last_solver = standing.code
+
+    def rank_of(self, team_code: str) -> Optional[int]:
+        # 📊 Ranking con empates (mismos puntos y penalización): 1 + equipos estrictamente mejores
+        standing = self.teams.get(team_code)
+        if standing is None:
+            return None
+        return self._order.bisect_left((-standing.points, standing.penalty)) + 1
+
+    def row(self, standing: TeamStanding) -> dict:
+        return {
+            "id": standing.id,
+            "name": standing.name,
+            "avatar": standing.avatar,
+            "color": standing.color,
+            "members": standing.members,
+            "points": standing.points,
+            "solves": standing.solves,
+            "totalTime": format_seconds(standing.penalty if self.penalty_mode else standing.last_time),
+            "penaltySeconds": standing.penalty,
+            "lastSolveSeconds": standing.last_time,
+            "lastSolve": self.problem_titles.get(standing.last_problem, ""),
+            "lastSolveTime": format_seconds(standing.last_time - standing.prev_time) if standing.solves else "00:00:00",
+            "isLastSolver": standing.code == self.last_solver,
+        }
+
+    def rows(self) -> list[dict]:
+        return [self.row(self.teams[key[-1]]) for key in self._order]
+
+    def position(self, team_code: str) -> int:
+        return self._order.index(self.teams[team_code].sort_key()) + 1
+
+    def window(self, start: int, stop: int) -> list[dict]:
+        # 🔎 Filas por posición sin recorrer la tabla: islice sobre la lista ordenada, O(log n + k)
+        rows = []
+        for position, key in enumerate(self._order.islice(start, stop), start + 1):
+            row = self.row(self.teams[key[-1]])
+            row["code"] = key[-1]
+            row["position"] = position
+            rows.append(row)
+        return rows
+
+    def around(self, team_code: str, radius: int) -> list[dict]:
+        # 🎯 "Mi posición ± radius"
+        index = self.position(team_code) - 1
+        return self.window(max(0, index - radius), index + radius + 1)
+
+    def summary(self) -> dict:
+        return {
+            "title": self.title,
+            "teams": self.registered,
+            "totalSolved": self.total_solved,
+        }
+
+    def serialized(self, key: str, build: Callable[[], bytes]) -> bytes:
+        # 📦 Cuerpos JSON pre-serializados por versión: se reconstruyen solo si el tablero cambió
+        cached = self._serialized.get(key)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, build())
+            self._serialized[key] = cached
+        return cached[1]
+
+    def snapshot_frame(self) -> str:
+        # Un solo snapshot serializado por versión, compartido por todos los clientes
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            rows = self.rows()
+            for idx, row in enumerate(rows):
+                row["position"] = idx + 1
+            frame = encode_event("snapshot", {"ranking": rows, "competition": self.summary()}, self.version)
+            self._snapshot = (self.version, frame)
+        return self._snapshot[1]
+
+    def update_frame(self, team_codes: list[str]) -> str:
+        rows = []
+        for code in team_codes:
+            row = self.row(self.teams[code])
+            row["code"] = code
+            row["position"] = self.position(code)
+            rows.append(row)
+        return encode_event("update", {"rows": rows, "competition": self.summary()}, self.version)
+
+
+# ─── Registro por proceso ──────────────────────────────────────────────────────
+
+_boards: dict[str, Scoreboard] = {}
+_locks: dict[str, asyncio.Lock] = {}
+_generation: dict[str, int] = {}
+_loaded_at: dict[str, float] = {}
+# ACs recibidos mientras una carga está leyendo Mongo: se aplican al tablero nuevo
+_loading: dict[str, list[tuple]] = {}
+
+
+def max_age() -> float:
+    return SCOREBOARD_BUS_TTL if events.has_transport() else SCOREBOARD_TTL
+
+
+def _fresh(competition_id: str) -> Optional[Scoreboard]:
+    board = _boards.get(competition_id)
+    if board is not None and time.monotonic() - _loaded_at.get(competition_id, 0.0) < max_age():
+        return board
+    return None
+
+
+async def _load(competition_id: str, engine: Optional[str] = None) -> Optional[Scoreboard]:
+    # Se lee del primario (no de read_db): el tablero se cachea y luego solo recibe
+    # incrementos, así que un secundario atrasado dejaría fuera ACs para siempre
+    compiled = await scoring.get_compiled(competition_id)
+    competition = await db["competition"].find_one({"id": competition_id}, {"_id": 0, "teams": 1})
+    if not compiled or not competition:
+        return None
+
+    team_codes = competition.get("teams", [])
+    board = Scoreboard(
+        competition_id,
+        compiled.title,
+        compiled.start.isoformat() if compiled.start else "",
+        compiled.duration,
+        {pid: p.title for pid, p in compiled.problems.items()},
+        len(team_codes),
+        penalty_mode=compiled.has_rule("icpc_penalty"),
+        freeze_at=compiled.freeze_at,
+    )
+
+    load_standings = ENGINES[engine or RANKING_ENGINE]
+    for standing in await load_standings(competition_id, team_codes):
+        board.add_team(standing)
+    return board
+
+
+def _standing(team: dict, members: list[str], solved: list[dict], points: int, penalty: int) -> TeamStanding:
+    # `solved`: primeros AC del equipo como {problem, time}
+    solved = sorted(solved, key=lambda s: s["time"])
+    return TeamStanding(
+        code=team["code"],
+        id=str(team.get("_id")),
+        name=team.get("teamName", ""),
+        avatar=team.get("avatar", ""),
+        color=team.get("color", "#ccc"),
+        members=members,
+        points=points,
+        solves=len(solved),
+        penalty=penalty,
+        last_time=solved[-1]["time"] if solved else 0,
+        prev_time=solved[-2]["time"] if len(solved) > 1 else 0,
+        last_problem=solved[-1]["problem"] if solved else "",
+        first_ac={s["problem"]: s["time"] for s in solved},
+    )
+
+
+async def _standings_python(competition_id: str, team_codes: list[str]) -> list[TeamStanding]:
+    # 🐍 Tres lecturas (miembros, agregados de envíos, equipos) y el cruce en el proceso
+    members: dict[str, list[str]] = {}
+    async for user in db["users"].find({"teamCode": {"$in": team_codes}}, {"username": 1, "teamCode": 1}):
+        members.setdefault(user.get("teamCode"), []).append(user["username"])
+
+    # 📊 Solo agregados por equipo: el historial de envíos nunca sale de Mongo
+    aggregates = {
+        doc["_id"]: doc
+        async for doc in db["submissions"].aggregate([
+            {"$match": {"competitionId": competition_id, "teamCode": {"$in": team_codes}, "status": "AC"}},
+            {"$group": {
+                "_id": "$teamCode",
+                "points": {"$sum": "$points"},
+                "penalty": {"$sum": "$penalty"},
+                "solved": {"$push": {"problem": "$problem", "time": "$time"}},
+            }},
+        ])
+    }
+
+    team_fields = {"code": 1, "teamName": 1, "avatar": 1, "color": 1}
+    standings = []
+    async for team in db["teams"].find({"code": {"$in": team_codes}}, team_fields):
+        agg = aggregates.get(team.get("code"), {})
+        standings.append(_standing(team, members.get(team.get("code"), []), agg.get("solved", []),
+                                   agg.get("points", 0), agg.get("penalty", 0)))
+    return standings
+
+
+def ranking_pipeline(competition_id: str, team_codes: list[str]) -> list[dict]:
+    """Agregación sobre `teams` que devuelve las filas finales ya ordenadas.
+
+    Solo usa `$lookup` por igualdad de campos (sin `let`/`pipeline`), que también
+    soporta Cosmos DB; los envíos de otras competencias se descartan con `$filter`
+    antes de salir del servidor.
+    """
+    accepted = {"$filter": {"input": "$submissions", "as": "s", "cond": {"$and": [
+        {"$eq": ["$$s.competitionId", competition_id]},
+        {"$eq": ["$$s.status", "AC"]},
+    ]}}}
+    return [
+        {"$match": {"code": {"$in": team_codes}}},
+        {"$lookup": {"from": "users", "localField": "code", "foreignField": "teamCode", "as": "users"}},
+        {"$lookup": {"from": "submissions", "localField": "code", "foreignField": "teamCode", "as": "submissions"}},
+        {"$project": {
+            "code": 1, "teamName": 1, "avatar": 1, "color": 1,
+            "members": "$users.username",
+            "accepted": accepted,
+        }},
+        {"$project": {
+            "code": 1, "teamName": 1, "avatar": 1, "color": 1, "members": 1,
+            "points": {"$sum": "$accepted.points"},
+            "penalty": {"$sum": "$accepted.penalty"},
+            "lastTime": {"$ifNull": [{"$max": "$accepted.time"}, 0]},
+            "solved": {"$map": {"input": "$accepted", "as": "s", "in": {"problem": "$$s.problem", "time": "$$s.time"}}},
+        }},
+        # Mismo orden que TeamStanding.sort_key
+        {"$sort": {"points": -1, "penalty": 1, "lastTime": 1, "code": 1}},
+    ]
+
+
+async def _standings_aggregate(competition_id: str, team_codes: list[str]) -> list[TeamStanding]:
+    # 🗄️ Un solo viaje a Mongo: el cruce equipos × miembros × envíos ocurre en el servidor
+    return [
+        _standing(doc, doc.get("members", []), doc.get("solved", []), doc.get("points", 0), doc.get("penalty", 0))
+        async for doc in db["teams"].aggregate(ranking_pipeline(competition_id, team_codes))
+    ]
+
+
+ENGINES = {
+    "python": _standings_python,
+    "aggregate": _standings_aggregate,
+}
+if RANKING_ENGINE not in ENGINES:
+    raise RuntimeError(f"RANKING_ENGINE inválido: {RANKING_ENGINE} (opciones: {', '.join(ENGINES)})")
+
+
+def loaded_boards() -> list[Scoreboard]:
+    return list(_boards.values())
+
+
+async def get_scoreboard(competition_id: str) -> Optional[Scoreboard]:
+    board = _fresh(competition_id)
+    if board is not None:
+        return board
+
+    lock = _locks.setdefault(competition_id, asyncio.Lock())
+    async with lock:
+        board = _fresh(competition_id)
+        if board is not None:
+            return board
+
+        previous = _boards.get(competition_id)
+        generation = _generation.get(competition_id, 0)
+        arrived = _loading[competition_id] = []
+        try:
+            board = await _load(competition_id)
+        finally:
+            _loading.pop(competition_id, None)
+        # Si la competencia se invalidó mientras se cargaba, no se cachea una foto vieja
+        if board is None or generation != _generation.get(competition_id, 0):
+            return board
+
+        # ➕ Los AC que llegaron durante la carga pudieron no alcanzar a leerse; record()
+        # ignora los que la carga ya contó (first_ac), así que reaplicarlos es seguro
+        for solve in arrived:
+            board.record(*solve)
+        _boards[competition_id] = board
+        _loaded_at[competition_id] = time.monotonic()
+        # ♻️ Recarga por antigüedad: los suscriptores reciben solo lo que aceptaron otros workers
+        if previous is not None:
+            await _publish_reload(competition_id, previous, board)
+        return board
+
+
+def record_submission(competition_id: str, team_code: str, problem_id: str, time: int, points: int,
+                      penalty: int = 0) -> None:
+    arrived = _loading.get(competition_id)
+    if arrived is not None:
+        arrived.append((team_code, problem_id, time, points, penalty))
+    board = _boards.get(competition_id)
+    if board is None:
+        return
+
+    changed = board.record(team_code, problem_id, time, points, penalty)
+    # 🧊 Con el ranking congelado no se publican cambios en vivo
+    if board.freeze_at is not None and time >= board.freeze_at:
+        return
+    # 📡 Un único frame calculado para todos los suscriptores
+    if changed and broadcaster.has_subscribers(competition_id):
+        broadcaster.publish(competition_id, board.update_frame(changed))
+
+
+def _changed_rows(previous: Scoreboard, board: Scoreboard) -> Optional[list[str]]:
+    # Equipos cuya fila cambió entre dos cargas; None si cambió el conjunto de equipos
+    if previous.teams.keys() != board.teams.keys():
+        return None
+    return [code for code, standing in board.teams.items()
+            if board.row(standing) != previous.row(previous.teams[code])]
+
+
+async def _publish_reload(competition_id: str, previous: Scoreboard, board: Scoreboard) -> None:
+    changed = _changed_rows(previous, board)
+    # Sin cambios el tablero nuevo conserva la versión: los clientes no ven nada
+    board.version = previous.version + (1 if changed != [] else 0)
+    if changed == [] or not broadcaster.has_subscribers(competition_id):
+        return
+    compiled = await scoring.get_compiled(competition_id)
+    if compiled and compiled.start and compiled.is_frozen(compiled.elapsed()):
+        return
+    if changed is None:
+        broadcaster.publish(competition_id, board.snapshot_frame())
+    else:
+        broadcaster.publish(competition_id, board.update_frame(changed))
+
+
+async def _publish_snapshot(competition_id: str, board: Scoreboard) -> None:
+    # 🧊 Congelado: los suscriptores conservan el snapshot del inicio del congelamiento
+    compiled = await scoring.get_compiled(competition_id)
+    if compiled and compiled.start and compiled.is_frozen(compiled.elapsed()):
+        return
+    broadcaster.publish(competition_id, board.snapshot_frame())
+
+
+async def _republish(competition_id: str) -> None:
+    board = await get_scoreboard(competition_id)
+    if board is not None:
+        await _publish_snapshot(competition_id, board)
+
+
+async def run_board_refresher() -> None:
+    # 📡 Los tableros con suscriptores SSE se recargan al vencer aunque nadie pida /ranking
+    while True:
+        await asyncio.sleep(max_age())
+        for competition_id in list(_boards):
+            if broadcaster.has_subscribers(competition_id):
+                try:
+                    await get_scoreboard(competition_id)
+                except Exception:
+                    logger.exception("Error recargando el tablero %s", competition_id)
+
+
+def invalidate(competition_id: str) -> None:
+    _boards.pop(competition_id, None)
+    _loaded_at.pop(competition_id, None)
+    _generation[competition_id] = _generation.get(competition_id, 0) + 1
+    if broadcaster.has_subscribers(competition_id):
+        asyncio.get_running_loop().create_task(_republish(competition_id))
+
+
+def invalidate_team(team_code: str) -> None:
+    # Cambió la membresía de un equipo: se descartan los tableros que lo incluyen
+    for competition_id, board in list(_boards.items()):
+        if team_code in board.teams:
+            invalidate(competition_id)
+
+
+def _on_competition_changed(competition_id: Optional[str]) -> None:
+    if competition_id:
+        invalidate(competition_id)
+
+
+# 📡 Cambios publicados por cualquier worker (ver app/services/events.py); record es idempotente
+events.subscribe(events.COMPETITION, _on_competition_changed)
+events.subscribe(events.TEAM, invalidate_team)
+events.subscribe(events.SOLVE, lambda solve: record_submission(**solve))
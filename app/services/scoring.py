@@ -0,0 +1,189 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Mapping, Optional
+from app.database import db
+from app.services import events
+from app.services.cache import TTLCache
+
+# Las competencias compiladas son inmutables; el TTL acota ediciones hechas fuera de la API
+COMPILED_TTL = float(os.getenv("COMPILED_COMPETITION_TTL", "300"))
+
+
+@dataclass(frozen=True, slots=True)
+class ProblemEntry:
+    id: str
+    title: str
+    slug: str
+    difficulty: str
+    points: int
+
+
+@dataclass(frozen=True, slots=True)
+class SolveContext:
+    elapsed: int
+    wrong_attempts: int = 0
+    first_blood: bool = False
+
+
+# ─── Reglas de puntuación ──────────────────────────────────────────────────────
+# Cada regla aporta puntos y/o segundos de penalización a un envío aceptado.
+
+class DifficultyPoints:
+    name = "difficulty"
+
+    def points(self, problem: ProblemEntry, ctx: SolveContext) -> int:
+        return problem.points
+
+    def penalty(self, problem: ProblemEntry, ctx: SolveContext) -> int:
+        return 0
+
+
+class FirstBloodBonus:
+    name = "first_blood"
+
+    def __init__(self, bonus: int = 0, **_):
+        self.bonus = bonus
+
+    def points(self, problem: ProblemEntry, ctx: SolveContext) -> int:
+        return self.bonus if ctx.first_blood else 0
+
+    def penalty(self, problem: ProblemEntry, ctx: SolveContext) -> int:
+        return 0
+
+
+class PenaltyTime:
+    """Estilo ICPC: tiempo del AC más `minutes` por cada intento fallido previo."""
+
+    name = "icpc_penalty"
+
+    def __init__(self, minutes: int = 20, **_):
+        self.minutes = minutes
+
+    def points(self, problem: ProblemEntry, ctx: SolveContext) -> int:
+        return 0
+
+    def penalty(self, problem: ProblemEntry, ctx: SolveContext) -> int:
+        return ctx.elapsed + ctx.wrong_attempts * self.minutes * 60
+
+
+RULES = {rule.name: rule for rule in (DifficultyPoints, FirstBloodBonus, PenaltyTime)}
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledCompetition:
+    id: str
+    title: str
+    start: Optional[datetime]
+    duration: int
+    status: str
+    freeze_at: Optional[int]  # segundos desde el inicio en que se congela el ranking público
+    problems: Mapping[str, ProblemEntry]
+    rules: tuple
+
+    def problem(self, problem_id: str) -> Optional[ProblemEntry]:
+        return self.problems.get(problem_id)
+
+    def elapsed(self, when: Optional[datetime] = None) -> int:
+        # Segundos de concurso transcurridos en `when` (por defecto, ahora)
+        when = when or datetime.now(timezone.utc)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return int((when - self.start).total_seconds())
+
+    def is_frozen(self, elapsed: int) -> bool:
+        # El ranking se descongela cuando el organizador marca la competencia como completada
+        return self.freeze_at is not None and elapsed >= self.freeze_at and self.status != "completed"
+
+    def has_rule(self, name: str) -> bool:
+        return any(rule.name == name for rule in self.rules)
+
+    def score(self, problem: ProblemEntry, ctx: SolveContext) -> tuple[int, int]:
+        points = sum(rule.points(problem, ctx) for rule in self.rules)
+        penalty = sum(rule.penalty(problem, ctx) for rule in self.rules)
+        return points, penalty
+
+
+def _parse_start(value) -> Optional[datetime]:
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    # Fechas viejas sin zona: se interpretan como UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def compile_competition(competition: dict) -> CompiledCompetition:
+    scoring = competition.get("scoring", {})
+    problems = {
+        str(p.get("id", "")): ProblemEntry(
+            id=str(p.get("id", "")),
+            title=p.get("title", ""),
+            slug=p.get("slug", ""),
+            difficulty=p.get("difficulty", ""),
+            points=scoring.get(p.get("difficulty"), 0),
+        )
+        for p in competition.get("problems", [])
+    }
+
+    rules = [DifficultyPoints()]
+    for config in competition.get("scoringRules") or []:
+        rule = RULES.get(config.get("name"))
+        if rule is not None and rule is not DifficultyPoints:
+            rules.append(rule(**{k: v for k, v in config.items() if k != "name"}))
+
+    duration = competition.get("duration", 0)
+    freeze_minutes = competition.get("freezeMinutes")
+
+    return CompiledCompetition(
+        id=competition.get("id", ""),
+        title=competition.get("title", ""),
+        start=_parse_start(competition.get("date")),
+        duration=duration,
+        status=competition.get("status", ""),
+        freeze_at=(duration - freeze_minutes) * 60 if freeze_minutes else None,
+        problems=MappingProxyType(problems),
+        rules=tuple(rules),
+    )
+
+
+# ─── Caché por proceso ─────────────────────────────────────────────────────────
+
+_compiled = TTLCache(maxsize=256, ttl=COMPILED_TTL)
+
+
+async def get_compiled(competition_id: str) -> Optional[CompiledCompetition]:
+    compiled = _compiled.get(competition_id)
+    if compiled is not None:
+        return compiled
+
+    competition = await db["competition"].find_one(
+        {"id": competition_id},
+        {"_id": 0, "id": 1, "title": 1, "date": 1, "duration": 1, "status": 1, "freezeMinutes": 1,
+         "scoring": 1, "scoringRules": 1, "problems": 1}
+    )
+    if not competition:
+        return None
+
+    compiled = compile_competition(competition)
+    _compiled.set(competition_id, compiled)
+    return compiled
+
+
+def invalidate(competition_id: Optional[str]) -> None:
+    if competition_id:
+        _compiled.delete(competition_id)
+
+
+events.subscribe(events.COMPETITION, invalidate)
+
+
+async def claim_first_blood(competition_id: str, problem_id: str, team_code: str) -> bool:
+    # 🩸 Reclamo atómico: solo el primer equipo logra escribir el campo
+    result = await db["competition"].update_one(
+        {"id": competition_id, f"firstBlood.{problem_id}": {"$exists": False}},
+        {"$set": {f"firstBlood.{problem_id}": team_code}}
+    )
+    return result.modified_count == 1
@@ -0,0 +1,54 @@
+import dataclasses
+import json
+from typing import Any
+from bson import ObjectId
+from fastapi import Response
+
+try:
+    import orjson  # dependencia opcional: serialización en C, datetime nativo
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto en bytes; orjson si está instalado, si no la librería estándar."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    # json estándar no serializa datetime: mismo formato ISO que orjson
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return _default(value)
+
+
+class FastJSONResponse(Response):
+    """Respuesta JSON sin jsonable_encoder: para rutas calientes con dicts ya armados."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Cuerpo JSON ya serializado (bytes cacheados), enviado tal cual."""
+
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
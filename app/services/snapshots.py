@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
+from app.database import db, read_db
+from app.services import events, scoreboard, scoring
+from app.services.cache import TTLCache
+from app.services.scoreboard import Scoreboard, TeamStanding
+
+logger = logging.getLogger(__name__)
+
+# Cada SNAPSHOT_INTERVAL segundos de concurso se guarda el estado del ranking:
+# un keyframe completo cada SNAPSHOT_KEYFRAME_EVERY intervalos y, entre ellos,
+# deltas con solo las filas que cambiaron respecto a su keyframe base.
+SNAPSHOTS = "ranking_snapshots"
+SNAPSHOT_INTERVAL = int(os.getenv("SNAPSHOT_INTERVAL", "60"))
+SNAPSHOT_KEYFRAME_EVERY = int(os.getenv("SNAPSHOT_KEYFRAME_EVERY", "10"))
+# Un solo worker escribe los snapshots de cada competencia, con un lease en Mongo
+SNAPSHOT_LEASES = "snapshot_leases"
+SNAPSHOT_LEASE_SECONDS = float(os.getenv("SNAPSHOT_LEASE_SECONDS", str(SNAPSHOT_INTERVAL * 3)))
+# Holgura extra al reaplicar envíos anteriores al snapshot: latencia de un envío
+# entre calcular su tiempo y llegar al tablero
+SNAPSHOT_REPLAY_SLACK = int(os.getenv("SNAPSHOT_REPLAY_SLACK", "30"))
+
+# Estado compacto por equipo: [points, solves, penalty, last_time, prev_time, last_problem, first_ac]
+_keyframes: dict[str, tuple[int, dict[str, list]]] = {}
+_written_versions: dict[str, int] = {}
+_leases: set[str] = set()
+_history = TTLCache(maxsize=256, ttl=float(os.getenv("HISTORY_CACHE_TTL", "30")))
+
+
+def _compact(standing: TeamStanding) -> list:
+    return [standing.points, standing.solves, standing.penalty,
+            standing.last_time, standing.prev_time, standing.last_problem, dict(standing.first_ac)]
+
+
+def elapsed_at(compiled: scoring.CompiledCompetition, when: Optional[datetime] = None) -> int:
+    return compiled.elapsed(when)
+
+
+# ─── Escritura periódica ───────────────────────────────────────────────────────
+
+async def write_snapshot(board: Scoreboard, elapsed: int) -> None:
+    cid = board.competition_id
+    bucket = elapsed // SNAPSHOT_INTERVAL
+    # Las filas reflejan el tablero en `elapsed`: ese es el instante del snapshot
+    at = elapsed
+    rows = {code: _compact(standing) for code, standing in board.teams.items()}
+
+    keyframe = _keyframes.get(cid)
+    if keyframe is None or bucket - keyframe[0] // SNAPSHOT_INTERVAL >= SNAPSHOT_KEYFRAME_EVERY:
+        doc = {"competitionId": cid, "kind": "full", "at": at, "rows": rows}
+        _keyframes[cid] = (at, rows)
+    else:
+        base_at, base_rows = keyframe
+        changed = {code: row for code, row in rows.items() if base_rows.get(code) != row}
+        doc = {"competitionId": cid, "kind": "delta", "at": at, "base": base_at, "rows": changed}
+
+    await db[SNAPSHOTS].replace_one(
+        {"competitionId": cid, "kind": doc["kind"], "at": at}, doc, upsert=True
+    )
+    _written_versions[cid] = board.version
+
+
+async def _hold_lease(competition_id: str) -> bool:
+    # 🔒 Renueva el lease propio o toma uno vencido; si otro worker lo tiene, el
+    # upsert choca con su _id y este worker no escribe
+    now = datetime.now(timezone.utc)
+    try:
+        await db[SNAPSHOT_LEASES].update_one(
+            {"_id": competition_id, "$or": [{"owner": events.origin()}, {"until": {"$lt": now}}]},
+            {"$set": {"owner": events.origin(), "until": now + timedelta(seconds=SNAPSHOT_LEASE_SECONDS)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        _leases.discard(competition_id)
+        return False
+    if competition_id not in _leases:
+        # Recién tomado: los deltas se calculan contra un keyframe propio, nunca el de otro worker
+        _leases.add(competition_id)
+        _keyframes.pop(competition_id, None)
+        _written_versions.pop(competition_id, None)
+    return True
+
+
+async def snapshot_loaded_boards() -> None:
+    for board in scoreboard.loaded_boards():
+        if _written_versions.get(board.competition_id) == board.version:
+            continue
+
+        compiled = await scoring.get_compiled(board.competition_id)
+        if not compiled or compiled.start is None:
+            continue
+
+        # Solo mientras el concurso corre
+        elapsed = elapsed_at(compiled)
+        if 0 <= elapsed <= compiled.duration * 60 + SNAPSHOT_INTERVAL and await _hold_lease(board.competition_id):
+            await write_snapshot(board, elapsed)
+
+
+async def run_snapshot_writer() -> None:
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        try:
+            await snapshot_loaded_boards()
+        except Exception:
+            logger.exception("Error escribiendo snapshots del ranking")
+
+
+# ─── Consultas históricas ──────────────────────────────────────────────────────
+
+async def _base_state(competition_id: str, elapsed: int) -> tuple[int, dict[str, list]]:
+    # 🧭 Keyframe más cercano o el delta más reciente (con su keyframe base)
+    keyframe = await read_db[SNAPSHOTS].find_one(
+        {"competitionId": competition_id, "kind": "full", "at": {"$lte": elapsed}}, sort=[("at", DESCENDING)]
+    )
+    delta = await read_db[SNAPSHOTS].find_one(
+        {"competitionId": competition_id, "kind": "delta", "at": {"$lte": elapsed}}, sort=[("at", DESCENDING)]
+    )
+
+    if delta and (not keyframe or delta["at"] > keyframe["at"]):
+        base = keyframe if keyframe and keyframe["at"] == delta["base"] else await read_db[SNAPSHOTS].find_one(
+            {"competitionId": competition_id, "kind": "full", "at": delta["base"]}
+        )
+        if base:
+            return delta["at"], {**base["rows"], **delta["rows"]}
+
+    if keyframe:
+        return keyframe["at"], keyframe["rows"]
+    return -1, {}
+
+
+async def board_at(competition_id: str, elapsed: int) -> Optional[Scoreboard]:
+    cache_key = (competition_id, elapsed)
+    cached = _history.get(cache_key)
+    if cached is not None:
+        return cached
+
+    live = await scoreboard.get_scoreboard(competition_id)
+    if live is None:
+        return None
+
+    base_at, state = await _base_state(competition_id, elapsed)
+
+    board = Scoreboard(
+        competition_id, live.title, live.date, live.duration,
+        live.problem_titles, live.registered, live.penalty_mode,
+    )
+    for code, standing in live.teams.items():
+        row = state.get(code, [0, 0, 0, 0, 0, "", {}])
+        points, solves, penalty, last_time, prev_time, last_problem = row[:6]
+        board.add_team(TeamStanding(
+            code=code, id=standing.id, name=standing.name, avatar=standing.avatar,
+            color=standing.color, members=standing.members,
+            points=points, solves=solves, penalty=penalty,
+            last_time=last_time, prev_time=prev_time, last_problem=last_problem,
+            # Con first_ac, record() ignora un AC que el snapshot ya contaba
+            first_ac=dict(row[6]) if len(row) > 6 else {},
+        ))
+
+    # ➕ Reaplicar los envíos entre el snapshot y el instante pedido, más una ventana
+    # previa: el tablero de quien escribió pudo no tener aún un AC con tiempo <= base_at
+    # (recarga pendiente, envío en vuelo). Con first_ac en las filas, record() ignora
+    # los que el snapshot ya contaba; las filas antiguas sin first_ac no admiten holgura
+    replay_from = base_at
+    if base_at >= 0 and all(len(row) > 6 for row in state.values()):
+        replay_from = base_at - int(scoreboard.max_age()) - SNAPSHOT_REPLAY_SLACK
+    cursor = read_db["submissions"].find(
+        {"competitionId": competition_id, "status": "AC", "time": {"$gt": replay_from, "$lte": elapsed}},
+        {"_id": 0, "teamCode": 1, "problem": 1, "time": 1, "points": 1, "penalty": 1},
+    ).sort("time", 1)
+    async for sub in cursor:
+        board.record(sub["teamCode"], sub["problem"], sub["time"], sub.get("points", 0), sub.get("penalty", 0))
+
+    _history.set(cache_key, board)
+    return board
@@ -0,0 +1,205 @@
+from dataclasses import replace
+from typing import Optional
+from bson import ObjectId
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
+from app.database import db, read_db
+from app.models_entity.views import SUBMISSION_FIELDS, SubmissionView
+from app.services import events, scoring
+from app.services.scoring import CompiledCompetition, ProblemEntry, SolveContext
+
+# Los envíos viven en su propia colección append-only; el equipo solo guarda
+# sus puntos y la lista acotada de problemas resueltos ("solved").
+# Índice (competitionId, teamCode, time): ver app/indexes.py
+SUBMISSIONS = "submissions"
+
+
+def ac_key(competition_id: str, team_code: str, problem_id: str) -> str:
+    # Solo los AC llevan `acKey`; el índice único disperso ac_key_unique admite uno
+    # por (competencia, equipo, problema): el propio insert es la deduplicación
+    return f"{competition_id}:{team_code}:{problem_id}"
+
+
+def submission_doc(competition_id: str, team_code: str, problem_id: str, status: str, elapsed_seconds: int,
+                   member: str, points: int, penalty: int = 0) -> dict:
+    # Documento con la forma de `Submission`, armado directo: los valores vienen del servidor
+    return {
+        "competitionId": competition_id,
+        "teamCode": team_code,
+        "problem": problem_id,
+        "status": status,
+        "time": elapsed_seconds,
+        "member": member,
+        "points": points,
+        "penalty": penalty,
+    }
+
+
+async def record_accepted(
+    competition_id: str,
+    team_code: str,
+    member: str,
+    problem_id: str,
+    elapsed_seconds: int,
+    points: int,
+    penalty: int = 0,
+    pending_id: Optional[ObjectId] = None,
+    first_blood_bonus: int = 0,
+) -> Optional[dict]:
+    # ⚛️ Primero el envío: el índice único de `acKey` rechaza el AC repetido, y el
+    # tablero (que se carga desde `submissions`) nunca queda sin un AC ya contado
+    submission = submission_doc(competition_id, team_code, problem_id, "AC", elapsed_seconds, member, points, penalty)
+    submission["acKey"] = ac_key(competition_id, team_code, problem_id)
+    try:
+        if pending_id is not None:
+            # ✅ El envío pendiente pasa a AC conservando su tiempo original
+            await db[SUBMISSIONS].update_one({"_id": pending_id}, {"$set": submission})
+            submission["_id"] = pending_id
+        else:
+            await db[SUBMISSIONS].insert_one(submission)
+    except DuplicateKeyError:
+        if pending_id is not None:
+            # Envío verificado de un problema ya resuelto: el pendiente sobra
+            await db[SUBMISSIONS].delete_one({"_id": pending_id, "status": "PENDING"})
+        return None
+
+    # 🩸 El primer AC se reclama solo después de ganar el AC del equipo: si se
+    # reclamara antes, un envío duplicado podría quedarse con el bono y perderlo
+    if first_blood_bonus and await scoring.claim_first_blood(competition_id, problem_id, team_code):
+        await db[SUBMISSIONS].update_one({"_id": submission["_id"]}, {"$inc": {"points": first_blood_bonus}})
+        points += first_blood_bonus
+        submission["points"] = points
+
+    # $inc evita perder puntos entre envíos concurrentes del mismo equipo
+    team = await db["teams"].update_one(
+        {"code": team_code}, {"$inc": {"points": points}, "$addToSet": {"solved": problem_id}}
+    )
+    if team.matched_count == 0:
+        # Equipo borrado entre la validación y el envío: el AC no cuenta
+        await db[SUBMISSIONS].delete_one({"_id": submission["_id"]})
+        return None
+    submission.pop("_id", None)
+    submission.pop("acKey", None)
+
+    # 📋 Actualizar el tablero materializado en O(log n), en este y en los demás workers
+    await events.publish(events.SOLVE, {
+        "competition_id": competition_id,
+        "team_code": team_code,
+        "problem_id": problem_id,
+        "time": elapsed_seconds,
+        "points": points,
+        "penalty": penalty,
+    })
+    return submission
+
+
+async def list_team_submissions(
+    competition_id: str,
+    team_code: str,
+    limit: int = 50,
+    before: Optional[str] = None,
+    until: Optional[int] = None,
+) -> tuple[list[SubmissionView], Optional[str]]:
+    # 📄 Página por keyset (time, _id) sobre el índice (competitionId, teamCode, time);
+    # `until` oculta los envíos desde ese segundo (ranking congelado)
+    query: dict = {"competitionId": competition_id, "teamCode": team_code}
+    if until is not None:
+        query["time"] = {"$lt": until}
+    if before:
+        time, _, last_id = before.partition(":")
+        query["$or"] = [
+            {"time": {"$lt": int(time)}},
+            {"time": int(time), "_id": {"$lt": ObjectId(last_id)}},
+        ]
+
+    cursor = (
+        read_db[SUBMISSIONS].find(query, SUBMISSION_FIELDS)
+        .sort([("time", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit)
+    )
+    docs = await cursor.to_list(length=limit)
+
+    next_cursor = None
+    if len(docs) == limit:
+        next_cursor = f"{docs[-1]['time']}:{docs[-1]['_id']}"
+    return [SubmissionView.from_doc(doc) for doc in docs], next_cursor
+
+
+async def frozen_until(competition_id: str) -> Optional[int]:
+    # 🧊 Segundo desde el que se ocultan resultados ajenos; None si no está congelada
+    compiled = await scoring.get_compiled(competition_id)
+    if compiled and compiled.start and compiled.is_frozen(compiled.elapsed()):
+        return compiled.freeze_at
+    return None
+
+
+async def hidden_solves(team_code: str) -> list[dict]:
+    # ACs del equipo posteriores al congelamiento de las competencias aún congeladas:
+    # otros equipos no deben verlos en los puntos ni en `solved` del equipo
+    windows = []
+    async for comp in db["competition"].find({"teams": team_code}, {"_id": 0, "id": 1}):
+        freeze_at = await frozen_until(comp["id"])
+        if freeze_at is not None:
+            windows.append({"competitionId": comp["id"], "time": {"$gte": freeze_at}})
+    if not windows:
+        return []
+    return await db[SUBMISSIONS].find(
+        {"teamCode": team_code, "status": "AC", "$or": windows}, {"_id": 0, "problem": 1, "points": 1}
+    ).to_list(length=None)
+
+
+async def count_wrong_attempts(competition_id: str, team_code: str, problem_id: str) -> int:
+    # Intentos fallidos previos al AC (prefijo del índice competition_team_time)
+    return await db[SUBMISSIONS].count_documents({
+        "competitionId": competition_id,
+        "teamCode": team_code,
+        "problem": problem_id,
+        "status": {"$nin": ["AC", "PENDING"]},
+    })
+
+
+async def accept_solve(
+    competition: CompiledCompetition,
+    team_code: str,
+    member: str,
+    problem: ProblemEntry,
+    elapsed_seconds: int,
+    pending_id: Optional[ObjectId] = None,
+) -> Optional[dict]:
+    # 🧮 Calcular puntos con las reglas de la competencia; el bono de primer AC se
+    # calcula aparte y se reclama dentro de record_accepted
+    wrong_attempts = 0
+    if competition.has_rule("icpc_penalty"):
+        wrong_attempts = await count_wrong_attempts(competition.id, team_code, problem.id)
+    ctx = SolveContext(elapsed=elapsed_seconds, wrong_attempts=wrong_attempts)
+    points, penalty = competition.score(problem, ctx)
+    bonus = 0
+    if competition.has_rule("first_blood"):
+        bonus = competition.score(problem, replace(ctx, first_blood=True))[0] - points
+
+    return await record_accepted(
+        competition.id, team_code, member, problem.id, elapsed_seconds, points, penalty, pending_id, bonus
+    )
+
+
+async def create_pending(
+    competition_id: str,
+    team_code: str,
+    member: str,
+    problem_id: str,
+    elapsed_seconds: int,
+) -> Optional[dict]:
+    # ⏳ Envío a la espera de verificación en LeetCode; aún no suma puntos
+    team = await db["teams"].find_one({"code": team_code}, {"_id": 1})
+    if team is None or await db[SUBMISSIONS].find_one({"acKey": ac_key(competition_id, team_code, problem_id)}, {"_id": 1}):
+        return None
+
+    query = {"competitionId": competition_id, "teamCode": team_code, "problem": problem_id, "status": "PENDING"}
+    existing = await db[SUBMISSIONS].find_one(query, {"_id": 0})
+    if existing:
+        return existing
+
+    submission = submission_doc(competition_id, team_code, problem_id, "PENDING", elapsed_seconds, member, 0)
+    await db[SUBMISSIONS].insert_one(submission)
+    submission.pop("_id", None)
+    return submission
@@ -0,0 +1,20 @@
+import os
+from typing import Callable
+from pymongo.errors import DuplicateKeyError
+from app.database import db
+from app.services.users import generate_code
+
+# 26^6 ≈ 3.1e8 códigos: con 100k equipos la probabilidad de choque es ~0.03%
+TEAM_CODE_ATTEMPTS = int(os.getenv("TEAM_CODE_ATTEMPTS", "8"))
+
+
+async def insert_team(build: Callable[[str], dict], attempts: int = TEAM_CODE_ATTEMPTS) -> dict:
+    # 🎲 Inserción optimista contra el índice único teams.code; si choca, otro código
+    for _ in range(attempts):
+        team = build(generate_code())
+        try:
+            await db["teams"].insert_one(team)
+            return team
+        except DuplicateKeyError:
+            continue
+    raise RuntimeError("No se pudo asignar un código de equipo único")
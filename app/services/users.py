@@ -11,11 +11,8 @@ def sanitize_user_dict(db_user: dict) -> dict:
         user_copy["_id"] = str(user_copy["_id"])
     return user_copy
 
-def generate_unique_code(existing_codes: set, length: int = 6) -> str:
-    while True:
-        code = ''.join(random.choices(string.ascii_uppercase, k=length))
-        if code not in existing_codes:
-            return code
+def generate_code(length: int = 6) -> str:
+    return ''.join(random.choices(string.ascii_uppercase, k=length))
 
 def validate_competition_date(date_str: str) -> datetime:
     try:
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pymongo import ReturnDocument
+from app.database import db
+from app.services import leetcode_api, scoring
+from app.services.submissions import SUBMISSIONS, accept_solve
+
+logger = logging.getLogger(__name__)
+
+# Con LEETCODE_VERIFY=true los envíos quedan PENDING hasta confirmarse en LeetCode
+VERIFY_ENABLED = os.getenv("LEETCODE_VERIFY", "false").lower() == "true"
+VERIFY_INTERVAL = float(os.getenv("VERIFY_INTERVAL", "5"))
+VERIFY_BATCH_SIZE = int(os.getenv("VERIFY_BATCH_SIZE", "200"))
+# Un envío que no aparece en LeetCode tras este plazo se rechaza como WA
+VERIFY_DEADLINE = int(os.getenv("VERIFY_DEADLINE", "600"))
+# Cada worker reclama sus envíos por este tiempo: nadie más los consulta en LeetCode
+# mientras tanto, y si el worker muere otro los retoma al vencer
+VERIFY_LEASE = float(os.getenv("VERIFY_LEASE", str(VERIFY_INTERVAL * 2)))
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def _get_wakeup() -> asyncio.Event:
+    global _wakeup
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    return _wakeup
+
+
+def notify() -> None:
+    # 🔔 Despierta al worker sin esperar al siguiente intervalo
+    _get_wakeup().set()
+
+
+def _is_verified(recent: list[dict], slug: str, start_ts: float) -> bool:
+    return any(
+        sub.get("titleSlug") == slug and int(sub.get("timestamp", 0)) >= start_ts
+        for sub in recent
+    )
+
+
+async def _reject(submission: dict) -> None:
+    await db[SUBMISSIONS].update_one({"_id": submission["_id"], "status": "PENDING"}, {"$set": {"status": "WA"}})
+
+
+async def _claim_pending(now: datetime) -> list[dict]:
+    # 🔒 Reclamo atómico por documento: con varios workers cada envío se verifica una vez
+    free = {"status": "PENDING", "verifyLeaseUntil": {"$not": {"$gt": now}}}
+    candidates = await db[SUBMISSIONS].find(free, {"_id": 1}).sort("time", 1).limit(VERIFY_BATCH_SIZE).to_list(
+        length=VERIFY_BATCH_SIZE
+    )
+    lease = {"$set": {"verifyLeaseUntil": now + timedelta(seconds=VERIFY_LEASE)}}
+    claimed = []
+    for candidate in candidates:
+        doc = await db[SUBMISSIONS].find_one_and_update(
+            {"_id": candidate["_id"], **free}, lease, return_document=ReturnDocument.BEFORE
+        )
+        if doc is not None:
+            claimed.append(doc)
+    return claimed
+
+
+async def verify_pending() -> dict:
+    pending = await _claim_pending(datetime.now(timezone.utc))
+    if not pending:
+        return {"pending": 0, "accepted": 0, "rejected": 0}
+
+    # 👤 usuario de la plataforma -> usuario de LeetCode, en una sola consulta
+    members = {sub["member"] for sub in pending}
+    users = await db["users"].find(
+        {"username": {"$in": list(members)}}, {"_id": 0, "username": 1, "leetcode_username": 1}
+    ).to_list(length=None)
+    handles = {u["username"]: u["leetcode_username"] for u in users if u.get("leetcode_username")}
+
+    # 📦 Consultas GraphQL agrupadas por lotes de usuarios (con caché y reintentos)
+    recent = await leetcode_api.recent_accepted(list(set(handles.values())))
+
+    now = datetime.now(timezone.utc)
+    accepted = rejected = 0
+    for sub in pending:
+        competition = await scoring.get_compiled(sub["competitionId"])
+        problem = competition.problem(sub["problem"]) if competition else None
+        if not competition or not problem or competition.start is None:
+            await _reject(sub)
+            rejected += 1
+            continue
+
+        handle = handles.get(sub["member"])
+        if handle and _is_verified(recent.get(handle, []), problem.slug, competition.start.timestamp()):
+            # ✅ Verificado: se puntúa con las reglas de la competencia y se actualiza el tablero
+            result = await accept_solve(competition, sub["teamCode"], sub["member"], problem, sub["time"], sub["_id"])
+            accepted += result is not None
+            continue
+
+        age = (now - competition.start).total_seconds() - sub["time"]
+        # Sin usuario de LeetCode se rechaza; si LeetCode no respondió se reintenta luego
+        if not handle or (handle in recent and age > VERIFY_DEADLINE):
+            await _reject(sub)
+            rejected += 1
+
+    return {"pending": len(pending), "accepted": accepted, "rejected": rejected}
+
+
+async def run_verification_worker() -> None:
+    wakeup = _get_wakeup()
+    while True:
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=VERIFY_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+        try:
+            await verify_pending()
+        except Exception:
+            logger.exception("Error verificando envíos en LeetCode")
@@ -0,0 +1,52 @@
+# ─── Utilidades compartidas por los benchmarks ─────────────────────────────────
+# Se usa un Mongo real si BENCH_MONGO_URL está definido; si no, mongomock-motor.
+# Debe llamarse a use_database() ANTES de importar app.main.
+import json
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("COSMOS_URL", "mongodb://localhost:27017")
+os.environ.setdefault("COSMOS_DB", "code_arena_bench")
+
+
+def use_database():
+    import app.database as database
+
+    url = os.getenv("BENCH_MONGO_URL")
+    if url:
+        import motor.motor_asyncio
+        client = motor.motor_asyncio.AsyncIOMotorClient(url)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+
+    database.db = client[os.getenv("BENCH_MONGO_DB", "code_arena_bench")]
+    database.read_db = database.db
+    return database.db
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def report(name: str, result: dict) -> None:
+    # Salida legible por máquina: una línea JSON por benchmark
+    print(json.dumps({"benchmark": name, **result}, ensure_ascii=False))
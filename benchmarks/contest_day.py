@@ -0,0 +1,262 @@
+# ─── Benchmark: tráfico de un día de concurso ──────────────────────────────────
+# Siembra N competencias con equipos, usuarios y envíos históricos y reproduce
+# una mezcla realista contra la app en proceso: tormenta de logins, ráfagas de
+# envíos, sondeo del ranking, vistas privadas y listados. Reporta p50/p95/p99 y
+# throughput por ruta en una línea JSON; con --baseline compara contra una
+# corrida previa y termina con código 1 si alguna ruta empeora (para CI):
+#
+#   python benchmarks/contest_day.py --duration 20 --output bench.json
+#   python benchmarks/contest_day.py --duration 20 --baseline bench.json
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _support import percentiles, report, use_database
+
+db = use_database()
+
+import httpx  # noqa: E402
+from app.indexes import ensure_indexes  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routes.auth import create_access_token  # noqa: E402
+from app.services import hashing  # noqa: E402
+from app.services.submissions import ac_key  # noqa: E402
+
+PASSWORD = "bench-password"
+DIFFICULTIES = ("easy", "medium", "hard")
+SCORING = {"easy": 1, "medium": 3, "hard": 5}
+
+# Peso relativo de cada operación en la mezcla (se puede ajustar con --mix)
+DEFAULT_MIX = {
+    "ranking": 50,
+    "private": 15,
+    "submission": 15,
+    "detail": 8,
+    "list": 5,
+    "team_submissions": 5,
+    "login": 2,
+}
+
+
+async def seed(rng: random.Random, competitions: int, teams: int, members: int, problems: int,
+               history: int) -> list[dict]:
+    await ensure_indexes(db)
+    hashed = hashing.pwd_context.hash(PASSWORD)
+    start = datetime.now(timezone.utc) - timedelta(minutes=60)
+    players = []
+
+    for c in range(competitions):
+        cid = f"bench-{c}"
+        codes = [f"C{c}T{i:04}" for i in range(teams)]
+        problem_ids = [f"C{c}P{j:03}" for j in range(problems)]
+        await db["competition"].insert_one({
+            "id": cid, "title": f"Bench {c}", "description": "", "maxTeamSize": members,
+            "date": start.isoformat(), "status": "active", "duration": 180, "teams": codes,
+            "problems": [
+                {"id": pid, "title": f"Problem {j}", "difficulty": DIFFICULTIES[j % 3],
+                 "url": "https://leetcode.com/problems/two-sum/", "slug": "two-sum",
+                 "isValid": True, "isValidating": False}
+                for j, pid in enumerate(problem_ids)
+            ],
+            "rules": [], "scoring": SCORING,
+        })
+
+        # 📜 Envíos históricos coherentes con los puntos y "solved" de cada equipo
+        solved: dict[str, dict[str, int]] = {code: {} for code in codes}
+        for _ in range(history):
+            code, j = rng.choice(codes), rng.randrange(problems)
+            solved[code].setdefault(problem_ids[j], rng.randrange(1, 3600))
+        submissions = [
+            {"competitionId": cid, "teamCode": code, "problem": pid, "status": "AC", "time": t,
+             "member": f"{code}-0", "points": SCORING[DIFFICULTIES[problem_ids.index(pid) % 3]], "penalty": 0,
+             "acKey": ac_key(cid, code, pid)}
+            for code, problems_solved in solved.items() for pid, t in problems_solved.items()
+        ]
+        if submissions:
+            await db["submissions"].insert_many(submissions)
+
+        points: dict[str, int] = {}
+        for sub in submissions:
+            points[sub["teamCode"]] = points.get(sub["teamCode"], 0) + sub["points"]
+        await db["teams"].insert_many([
+            {"code": code, "teamName": f"Team {code}", "avatar": "", "color": "#ccc", "maxMembers": members,
+             "currentMembers": members, "points": points.get(code, 0), "solved": list(solved[code])}
+            for code in codes
+        ])
+
+        users = [
+            {"username": f"{code}-{m}", "email": f"{code}-{m}@bench.dev", "password": hashed, "teamCode": code}
+            for code in codes for m in range(members)
+        ]
+        result = await db["users"].insert_many(users)
+        for user, _id in zip(users, result.inserted_ids):
+            players.append({
+                "competition": cid,
+                "team": user["teamCode"],
+                "username": user["username"],
+                "problems": problem_ids,
+                "headers": {"Authorization": f"Bearer {create_access_token({'sub': user['email'], 'id': str(_id)})}"},
+            })
+    return players
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[int, int]] = {}
+        self.errors: dict[str, int] = {}
+
+    def add(self, route: str, elapsed: float, status: int, expected: tuple[int, ...]) -> None:
+        self.samples.setdefault(route, []).append(elapsed)
+        counts = self.statuses.setdefault(route, {})
+        counts[status] = counts.get(status, 0) + 1
+        if status not in expected:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+async def run_client(client: httpx.AsyncClient, rec: Recorder, rng: random.Random, players: list[dict],
+                     mix: dict[str, int], deadline: float, budget: list[int]) -> None:
+    ops, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline and budget[0] > 0:
+        budget[0] -= 1
+        player = rng.choice(players)
+        cid, op = player["competition"], rng.choices(ops, weights)[0]
+
+        if op == "ranking":
+            route, expected = "GET /ranking/{competitionId}", (200,)
+            request = client.get(f"/ranking/{cid}")
+        elif op == "private":
+            route, expected = "GET /competition/private/{competitionId}", (200,)
+            request = client.get(f"/competition/private/{cid}", headers=player["headers"])
+        elif op == "submission":
+            route, expected = "POST /competition/submission/{competitionId}/{problemId}", (200, 409)
+            request = client.post(f"/competition/submission/{cid}/{rng.choice(player['problems'])}",
+                                  headers=player["headers"])
+        elif op == "detail":
+            route, expected = "GET /competition/{competitionId}", (200,)
+            request = client.get(f"/competition/{cid}")
+        elif op == "list":
+            route, expected = "GET /competition/all", (200,)
+            request = client.get("/competition/all", params={"view": "summary", "limit": 20})
+        elif op == "team_submissions":
+            route, expected = "GET /teams/team/{code}/submissions", (200,)
+            request = client.get(f"/teams/team/{player['team']}/submissions",
+                                 params={"competitionId": cid, "limit": 20}, headers=player["headers"])
+        else:
+            route, expected = "POST /auth/login", (200,)
+            request = client.post("/auth/login", data={"username": player["username"], "password": PASSWORD})
+
+        started = time.perf_counter()
+        try:
+            status = (await request).status_code
+        except Exception:
+            status = 599
+        rec.add(route, time.perf_counter() - started, status, expected)
+
+
+def summarize(rec: Recorder, elapsed: float) -> dict:
+    routes = {}
+    for route, samples in sorted(rec.samples.items()):
+        routes[route] = {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "errors": rec.errors.get(route, 0),
+            "statuses": rec.statuses[route],
+            "latency_ms": percentiles(samples),
+        }
+    total = sum(len(s) for s in rec.samples.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "errors": sum(rec.errors.values()),
+        "routes": routes,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_ms: float) -> list[dict]:
+    # 📉 Regresión: p95 por encima de la línea base en más de `tolerance` y de `min_ms`
+    regressions = []
+    for route, current in result["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if not previous:
+            continue
+        now_p95, base_p95 = current["latency_ms"]["p95"], previous["latency_ms"]["p95"]
+        if now_p95 > base_p95 * (1 + tolerance) and now_p95 - base_p95 > min_ms:
+            regressions.append({"route": route, "p95_ms": now_p95, "baseline_p95_ms": base_p95})
+    return regressions
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    players = await seed(rng, args.competitions, args.teams, args.members, args.problems, args.history)
+
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix or []:
+        name, _, weight = item.partition("=")
+        mix[name] = int(weight)
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+
+    rec = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 🔥 Calentamiento: carga los tableros y cachés antes de medir
+        for c in range(args.competitions):
+            await client.get(f"/ranking/bench-{c}")
+
+        budget = [args.requests]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            run_client(client, rec, random.Random(args.seed + i), players, mix, deadline, budget)
+            for i in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    result = {
+        "seed": args.seed,
+        "clients": args.clients,
+        "dataset": {"competitions": args.competitions, "teams": args.teams, "members": args.members,
+                    "problems": args.problems, "history": args.history},
+        "mix": mix,
+        **summarize(rec, elapsed),
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance, args.min_ms)
+    result["ok"] = result["errors"] == 0 and not result.get("regressions")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--competitions", type=int, default=3)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--members", type=int, default=3)
+    parser.add_argument("--problems", type=int, default=12)
+    parser.add_argument("--history", type=int, default=300, help="envíos históricos por competencia")
+    parser.add_argument("--clients", type=int, default=50, help="clientes virtuales concurrentes")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de carga")
+    parser.add_argument("--requests", type=int, default=1_000_000, help="tope total de peticiones")
+    parser.add_argument("--mix", nargs="*", help="pesos de la mezcla, ej: ranking=80 login=0")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="guardar el resultado JSON (línea base para --baseline)")
+    parser.add_argument("--baseline", help="resultado previo contra el cual comparar")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="aumento relativo de p95 tolerado")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="aumento absoluto de p95 ignorado (ruido)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report("contest_day", result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "contest_day", **result}, f, ensure_ascii=False, indent=2)
+    raise SystemExit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# ─── Benchmark: tormenta de logins ─────────────────────────────────────────────
+# Lanza muchos /auth/login concurrentes y mide, al mismo tiempo, la latencia de
+# un endpoint que no hashea (/ranking/{id}). Con bcrypt fuera del event loop
+# el p99 de ese endpoint debe mantenerse plano respecto a la línea base.
+#
+#   python benchmarks/login_storm.py --logins 200 --probes 200
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from _support import percentiles, report, use_database
+
+db = use_database()
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import hashing  # noqa: E402
+
+
+async def seed(users: int) -> None:
+    hashed = hashing.pwd_context.hash("bench-password")
+    await db["users"].insert_many([
+        {"username": f"user{i}", "email": f"user{i}@bench.dev", "password": hashed, "teamCode": None}
+        for i in range(users)
+    ])
+    await db["competition"].insert_one({
+        "id": "bench", "title": "Bench", "date": datetime.now(timezone.utc).isoformat(),
+        "duration": 120, "teams": [], "problems": [], "scoring": {"easy": 1, "medium": 3, "hard": 5},
+    })
+
+
+async def probe(client: httpx.AsyncClient, count: int, interval: float) -> list[float]:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await client.get("/ranking/bench")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def run(args) -> dict:
+    await seed(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline = await probe(client, args.probes, args.interval)
+
+        login_latencies: list[float] = []
+
+        async def login(i: int):
+            started = time.perf_counter()
+            r = await client.post("/auth/login", data={"username": f"user{i % args.users}", "password": "bench-password"})
+            assert r.status_code == 200, r.text
+            login_latencies.append(time.perf_counter() - started)
+
+        storm = asyncio.gather(*(login(i) for i in range(args.logins)))
+        during = await probe(client, args.probes, args.interval)
+        await storm
+
+    return {
+        "logins": args.logins,
+        "hash_concurrency": hashing.HASH_CONCURRENCY,
+        "probe_baseline_ms": percentiles(baseline),
+        "probe_during_storm_ms": percentiles(during),
+        "login_ms": percentiles(login_latencies),
+        "hashing": hashing.metrics.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005)
+    report("login_storm", asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ─── Benchmark: motores de carga del tablero ───────────────────────────────────
+# Compara la carga en frío de un tablero con RANKING_ENGINE=python (miembros,
+# agregados de envíos y equipos en lecturas separadas, cruzados en el proceso)
+# contra RANKING_ENGINE=aggregate (una sola agregación en Mongo), y verifica que
+# ambos produzcan exactamente las mismas filas. mongomock ejecuta las
+# agregaciones en Python, así que las cifras representativas se toman contra un
+# Mongo real:
+#
+#   BENCH_MONGO_URL=mongodb://localhost:27017 python benchmarks/ranking_engines.py --teams 500
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _support import percentiles, report, use_database
+
+db = use_database()
+
+from app.indexes import ensure_indexes  # noqa: E402
+from app.services import scoreboard, scoring  # noqa: E402
+
+COMPETITION = "bench-engines"
+DIFFICULTIES = ("easy", "medium", "hard")
+SCORING = {"easy": 1, "medium": 3, "hard": 5}
+
+
+async def seed(rng: random.Random, teams: int, members: int, problems: int, noise: int) -> None:
+    await ensure_indexes(db)
+    for name in ("competition", "teams", "users", "submissions"):
+        await db[name].delete_many({})
+
+    codes = [f"T{i:05}" for i in range(teams)]
+    await db["competition"].insert_one({
+        "id": COMPETITION, "title": "Engines", "description": "", "maxTeamSize": members,
+        "date": (datetime.now(timezone.utc) - timedelta(minutes=90)).isoformat(),
+        "status": "active", "duration": 180, "teams": codes,
+        "problems": [{"id": f"P{j}", "title": f"Problem {j}", "difficulty": DIFFICULTIES[j % 3],
+                      "url": "https://leetcode.com/problems/two-sum/", "isValid": True, "isValidating": False}
+                     for j in range(problems)],
+        "rules": [], "scoring": SCORING,
+    })
+    await db["teams"].insert_many([
+        {"code": code, "teamName": f"Team {i}", "avatar": "🦊", "color": "#ccc", "maxMembers": members,
+         "currentMembers": members, "points": 0, "solved": []}
+        for i, code in enumerate(codes)
+    ])
+    await db["users"].insert_many([
+        {"username": f"u{i}-{m}", "email": f"u{i}-{m}@bench", "password": "x", "teamCode": code}
+        for i, code in enumerate(codes) for m in range(members)
+    ])
+
+    submissions = []
+    for code in codes:
+        for j in rng.sample(range(problems), rng.randint(0, problems)):
+            difficulty = DIFFICULTIES[j % 3]
+            for _ in range(rng.randint(0, 2)):
+                submissions.append({"competitionId": COMPETITION, "teamCode": code, "problem": f"P{j}",
+                                    "status": "WA", "time": rng.randint(0, 5400), "member": "", "points": 0})
+            submissions.append({"competitionId": COMPETITION, "teamCode": code, "problem": f"P{j}",
+                                "status": "AC", "time": rng.randint(0, 5400), "member": "",
+                                "points": SCORING[difficulty], "penalty": 0})
+        # Historial de otras competencias: el motor de agregación debe descartarlo
+        submissions.extend({"competitionId": "other", "teamCode": code, "problem": "X", "status": "AC",
+                            "time": 0, "member": "", "points": 1, "penalty": 0} for _ in range(noise))
+    if submissions:
+        await db["submissions"].insert_many(submissions)
+
+
+async def measure(engine: str, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await scoreboard._load(COMPETITION, engine)
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=300)
+    parser.add_argument("--members", type=int, default=3)
+    parser.add_argument("--problems", type=int, default=12)
+    parser.add_argument("--noise", type=int, default=5, help="envíos de otras competencias por equipo")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    await seed(random.Random(args.seed), args.teams, args.members, args.problems, args.noise)
+    await scoring.get_compiled(COMPETITION)  # la definición compilada queda en caché para ambos
+
+    boards = {engine: await scoreboard._load(COMPETITION, engine) for engine in scoreboard.ENGINES}
+    results = {
+        "teams": args.teams,
+        "equivalent": boards["python"].rows() == boards["aggregate"].rows(),
+    }
+    for engine in scoreboard.ENGINES:
+        results[f"{engine}_ms"] = await measure(engine, args.rounds)
+    report("ranking_engines", results)
+    if not results["equivalent"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+# ─── Benchmark: serialización de respuestas grandes ────────────────────────────
+# Compara, para un ranking de N equipos y una vista privada con envíos, el
+# camino por defecto de FastAPI (jsonable_encoder + json) contra orjson y
+# contra el cuerpo pre-serializado que sirve el tablero en caché.
+#
+#   python benchmarks/serialization.py --teams 300 --rounds 200
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from _support import percentiles, report, use_database
+
+use_database()
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from app.services.scoreboard import Scoreboard, TeamStanding  # noqa: E402
+from app.services.serialization import dumps, orjson  # noqa: E402
+
+
+def build_board(teams: int, members: int, problems: int) -> Scoreboard:
+    board = Scoreboard("bench", "Bench", datetime.now(timezone.utc).isoformat(), 180,
+                       {f"P{j}": f"Problem {j}" for j in range(problems)}, teams)
+    for i in range(teams):
+        board.add_team(TeamStanding(
+            code=f"T{i:04}", id=str(ObjectId()), name=f"Team {i}", avatar="🦊", color="#ccc",
+            members=[f"user-{i}-{m}" for m in range(members)],
+        ))
+    for i in range(teams):
+        for j in range(i % problems):
+            board.record(f"T{i:04}", f"P{j}", 60 * (i + j), 3)
+    return board
+
+
+def private_payload(submissions: int) -> dict:
+    return {
+        "competition": {"id": "bench", "title": "Bench", "date": datetime.now(timezone.utc), "duration": 180,
+                        "problems": [{"id": f"P{j}", "title": f"Problem {j}", "difficulty": "easy"} for j in range(12)]},
+        "team": {"team": {
+            "name": "Team",
+            "members": [{"id": str(ObjectId()), "username": f"user{m}", "leetcode": None} for m in range(3)],
+            "submissions": [
+                {"id": str(ObjectId()), "competitionId": "bench", "teamCode": "T0001", "problem": f"P{k % 12}",
+                 "status": "AC", "time": k * 30, "member": "user0", "points": 3, "penalty": 0}
+                for k in range(submissions)
+            ],
+            "points": 100, "ranking": 1, "totalTeams": 300, "avatar": "",
+        }},
+    }
+
+
+def measure(fn, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=300)
+    parser.add_argument("--members", type=int, default=3)
+    parser.add_argument("--problems", type=int, default=12)
+    parser.add_argument("--submissions", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    board = build_board(args.teams, args.members, args.problems)
+    ranking = {"ranking": board.rows(), "competition": board.summary()}
+    private = private_payload(args.submissions)
+
+    def stdlib(content):
+        # Camino por defecto de FastAPI para un dict devuelto por la ruta
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    cached = board.serialized("ranking", lambda: dumps(board.rows()))
+    results = {
+        "engine": "orjson" if orjson is not None else "json",
+        "ranking_bytes": len(dumps(ranking)),
+        "private_bytes": len(dumps(private)),
+        "ranking": {
+            "jsonable_encoder+json_ms": measure(lambda: stdlib(ranking), args.rounds),
+            "dumps_ms": measure(lambda: dumps(ranking), args.rounds),
+            "rows+dumps_ms": measure(lambda: dumps({"ranking": board.rows(), "competition": board.summary()}),
+                                     args.rounds),
+            "preserialized_ms": measure(
+                lambda: b'{"ranking":' + board.serialized("ranking", lambda: cached)
+                + b',"competition":' + dumps(board.summary()) + b'}', args.rounds),
+        },
+        "private": {
+            "jsonable_encoder+json_ms": measure(lambda: stdlib(private), args.rounds),
+            "dumps_ms": measure(lambda: dumps(private), args.rounds),
+        },
+    }
+    # Las salidas deben ser equivalentes como JSON
+    results["equivalent"] = json.loads(stdlib(ranking)) == json.loads(dumps(ranking))
+    report("serialization", results)
+
+
+if __name__ == "__main__":
+    main()
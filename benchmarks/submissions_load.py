@@ -0,0 +1,118 @@
+# ─── Benchmark: ingesta concurrente de envíos ──────────────────────────────────
+# Dispara envíos concurrentes (con muchos repetidos por equipo) contra la app
+# en proceso y verifica que no se pierdan puntos ni se dupliquen problemas.
+#
+#   python benchmarks/submissions_load.py --submissions 5000 --rate 1000
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from _support import percentiles, report, use_database
+
+db = use_database()
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routes.auth import create_access_token  # noqa: E402
+
+
+async def seed(teams: int, members: int, problems: int) -> list[dict]:
+    await db["competition"].insert_one({
+        "id": "bench",
+        "title": "Bench",
+        "date": (datetime.now(timezone.utc) - timedelta(minutes=30)).isoformat(),
+        "duration": 180,
+        "teams": [f"T{i:04}" for i in range(teams)],
+        "problems": [
+            {"id": f"P{j:03}", "title": f"Problem {j}", "difficulty": ("easy", "medium", "hard")[j % 3]}
+            for j in range(problems)
+        ],
+        "scoring": {"easy": 1, "medium": 3, "hard": 5},
+    })
+    await db["teams"].insert_many([
+        {"code": f"T{i:04}", "teamName": f"Team {i}", "avatar": "", "color": "#ccc",
+         "maxMembers": members, "currentMembers": members, "points": 0, "solved": []}
+        for i in range(teams)
+    ])
+    users = [
+        {"username": f"u{i}-{m}", "email": f"u{i}-{m}@bench.dev", "password": "", "teamCode": f"T{i:04}"}
+        for i in range(teams) for m in range(members)
+    ]
+    result = await db["users"].insert_many(users)
+    return [
+        {"Authorization": f"Bearer {create_access_token({'sub': u['email'], 'id': str(_id)})}"}
+        for u, _id in zip(users, result.inserted_ids)
+    ]
+
+
+async def run(args) -> dict:
+    headers = await seed(args.teams, args.members, args.problems)
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def submit(h: dict, problem: str):
+            started = time.perf_counter()
+            r = await client.post(f"/competition/submission/bench/{problem}", headers=h)
+            latencies.append(time.perf_counter() - started)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        # 🚀 Envíos espaciados para sostener la tasa objetivo
+        tasks = []
+        started = time.perf_counter()
+        for n in range(args.submissions):
+            delay = started + n / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            h = random.choice(headers)
+            problem = f"P{random.randrange(args.problems):03}"
+            tasks.append(asyncio.create_task(submit(h, problem)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    # 🔎 Verificación: puntos del equipo == suma de sus envíos, sin problemas repetidos
+    lost_points = 0
+    duplicated = 0
+    stored = 0
+    per_team: dict[str, list[dict]] = {}
+    async for sub in db["submissions"].find({"competitionId": "bench"}):
+        per_team.setdefault(sub["teamCode"], []).append(sub)
+    async for team in db["teams"].find({}, {"code": 1, "points": 1}):
+        subs = per_team.get(team["code"], [])
+        stored += len(subs)
+        lost_points += abs(sum(s["points"] for s in subs) - team.get("points", 0))
+        duplicated += len(subs) - len({s["problem"] for s in subs})
+
+    return {
+        "submissions": args.submissions,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.submissions / elapsed, 1),
+        "statuses": statuses,
+        "accepted": statuses.get(200, 0),
+        "stored": stored,
+        "lost_points": lost_points,
+        "duplicated": duplicated,
+        "latency_ms": percentiles(latencies),
+        "ok": lost_points == 0 and duplicated == 0 and stored == statuses.get(200, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--members", type=int, default=3)
+    parser.add_argument("--problems", type=int, default=12)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report("submissions_load", result)
+    raise SystemExit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
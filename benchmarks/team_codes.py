@@ -0,0 +1,75 @@
+# ─── Benchmark: creación de equipos con N equipos existentes ───────────────────
+# Mide el costo de asignar un código (inserción optimista contra el índice
+# único) a medida que crece la colección, y lo compara con el escaneo
+# completo de códigos que se hacía antes. mongomock inserta en tiempo lineal,
+# así que las cifras representativas (100k+ equipos) se toman contra un Mongo
+# real:
+#
+#   BENCH_MONGO_URL=mongodb://localhost:27017 python benchmarks/team_codes.py
+import argparse
+import asyncio
+import os
+import time
+
+from _support import report, use_database
+
+db = use_database()
+
+from app.indexes import ensure_indexes  # noqa: E402
+from app.services.teams import insert_team  # noqa: E402
+from app.services.users import generate_code  # noqa: E402
+
+
+def team_doc(code: str) -> dict:
+    return {"code": code, "teamName": "bench", "avatar": "", "color": "#ccc",
+            "maxMembers": 3, "currentMembers": 1, "points": 0, "solved": []}
+
+
+async def grow_to(size: int) -> None:
+    missing = size - await db["teams"].count_documents({})
+    codes: set[str] = set()
+    while len(codes) < missing:
+        codes.add(generate_code())
+    # Puede chocar con algún código ya insertado: se ignoran los duplicados
+    for start in range(0, len(codes), 5000):
+        batch = [team_doc(c) for c in list(codes)[start:start + 5000]]
+        try:
+            await db["teams"].insert_many(batch, ordered=False)
+        except Exception:
+            pass
+
+
+async def run(args) -> dict:
+    await ensure_indexes(db)
+    results = []
+    for size in args.sizes:
+        await grow_to(size)
+
+        started = time.perf_counter()
+        for _ in range(args.creates):
+            await insert_team(team_doc)
+        allocate = (time.perf_counter() - started) / args.creates
+
+        started = time.perf_counter()
+        await db["teams"].find({}, {"code": 1}).to_list(length=None)
+        legacy_scan = time.perf_counter() - started
+
+        results.append({
+            "teams": await db["teams"].count_documents({}),
+            "allocate_ms": round(allocate * 1000, 3),
+            "legacy_scan_ms": round(legacy_scan * 1000, 3),
+        })
+    backend = "mongodb" if os.getenv("BENCH_MONGO_URL") else "mongomock"
+    return {"backend": backend, "creates_per_size": args.creates, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    default_sizes = [1000, 10000, 100000] if os.getenv("BENCH_MONGO_URL") else [200, 500, 1000]
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument("--creates", type=int, default=200)
+    report("team_codes", asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# ─── Migración: clave de deduplicación de los AC ───────────────────────────────
+# Los AC guardados antes del índice único ac_key_unique no tienen `acKey`, así que
+# un AC nuevo del mismo (competencia, equipo, problema) no chocaría con ellos.
+# Asigna la clave al primer AC de cada terna y reporta los repetidos.
+#
+#   python scripts/backfill_ac_keys.py [--dry-run]
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import db  # noqa: E402
+from app.indexes import ensure_indexes  # noqa: E402
+from app.services.submissions import SUBMISSIONS, ac_key  # noqa: E402
+
+
+async def backfill(dry_run: bool) -> None:
+    taken = {doc["acKey"] async for doc in db[SUBMISSIONS].find({"acKey": {"$exists": True}}, {"acKey": 1})}
+
+    assigned = duplicates = 0
+    cursor = db[SUBMISSIONS].find(
+        {"status": "AC", "acKey": {"$exists": False}},
+        {"competitionId": 1, "teamCode": 1, "problem": 1},
+    ).sort("time", 1)
+    async for sub in cursor:
+        if not sub.get("competitionId"):
+            continue
+        key = ac_key(sub["competitionId"], sub["teamCode"], sub["problem"])
+        if key in taken:
+            print(f"⚠️  AC repetido {key} ({sub['_id']}): se deja sin clave")
+            duplicates += 1
+            continue
+        taken.add(key)
+        assigned += 1
+        if not dry_run:
+            await db[SUBMISSIONS].update_one({"_id": sub["_id"]}, {"$set": {"acKey": key}})
+
+    if not dry_run:
+        await ensure_indexes(db)
+    print(f"{'(dry-run) ' if dry_run else ''}{assigned} claves asignadas, {duplicates} AC repetidos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(backfill(parser.parse_args().dry_run))
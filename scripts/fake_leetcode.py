@@ -0,0 +1,82 @@
+# ─── Servidor LeetCode falso para desarrollo y pruebas ─────────────────────────
+# Responde el subconjunto de GraphQL que usa la API (recentAcSubmissionList
+# con alias por usuario y el questionList del catálogo de problemas). Los AC
+# se registran con POST /_accept y se puede simular latencia y errores 5xx/429:
+#
+#   FAKE_LEETCODE_LATENCY=0.05 FAKE_LEETCODE_FAIL_RATE=0.2 python scripts/fake_leetcode.py --port 8900
+#   LEETCODE_URL=http://127.0.0.1:8900 LEETCODE_VERIFY=true uvicorn app.main:app
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse
+
+LATENCY = float(os.getenv("FAKE_LEETCODE_LATENCY", "0"))
+FAIL_RATE = float(os.getenv("FAKE_LEETCODE_FAIL_RATE", "0"))
+# Problemas sintéticos del catálogo, además de unos cuantos reales
+CATALOG_SIZE = int(os.getenv("FAKE_LEETCODE_PROBLEMS", "500"))
+
+# alias: recentAcSubmissionList(username: $var, limit: $limit)
+RECENT_FIELD = re.compile(r"(\w+)\s*:\s*recentAcSubmissionList\(\s*username:\s*\$(\w+)\s*,\s*limit:\s*\$(\w+)\s*\)")
+
+CATALOG = [
+    {"questionFrontendId": "1", "title": "Two Sum", "titleSlug": "two-sum", "difficulty": "Easy", "paidOnly": False},
+    {"questionFrontendId": "2", "title": "Add Two Numbers", "titleSlug": "add-two-numbers",
+     "difficulty": "Medium", "paidOnly": False},
+    {"questionFrontendId": "4", "title": "Median of Two Sorted Arrays", "titleSlug": "median-of-two-sorted-arrays",
+     "difficulty": "Hard", "paidOnly": False},
+] + [
+    {"questionFrontendId": str(10000 + i), "title": f"Fake Problem {i}", "titleSlug": f"fake-problem-{i}",
+     "difficulty": ("Easy", "Medium", "Hard")[i % 3], "paidOnly": i % 7 == 0}
+    for i in range(CATALOG_SIZE)
+]
+
+app = FastAPI(title="Fake LeetCode")
+accepted: dict[str, list[dict]] = {}
+stats = {"requests": 0, "failures": 0, "aliases": 0}
+
+
+@app.post("/graphql")
+async def graphql(payload: dict = Body(...)):
+    stats["requests"] += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if random.random() < FAIL_RATE:
+        stats["failures"] += 1
+        return JSONResponse(status_code=random.choice([429, 502, 503]), content={"error": "fake failure"})
+
+    variables = payload.get("variables") or {}
+    data = {}
+    if "questionList" in payload.get("query", ""):
+        skip, limit = int(variables.get("skip", 0)), int(variables.get("limit", 50))
+        data["problemsetQuestionList"] = {"total": len(CATALOG), "questions": CATALOG[skip:skip + limit]}
+    for alias, user_var, limit_var in RECENT_FIELD.findall(payload.get("query", "")):
+        stats["aliases"] += 1
+        subs = accepted.get(variables.get(user_var), [])
+        data[alias] = sorted(subs, key=lambda s: -int(s["timestamp"]))[: int(variables.get(limit_var, 20))]
+    return {"data": data}
+
+
+@app.post("/_accept")
+async def accept(username: str = Body(...), titleSlug: str = Body(...), timestamp: int | None = Body(None)):
+    accepted.setdefault(username, []).append({"titleSlug": titleSlug, "timestamp": str(timestamp or int(time.time()))})
+    return {"ok": True}
+
+
+@app.get("/_stats")
+async def get_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
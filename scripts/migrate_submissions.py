@@ -0,0 +1,76 @@
+# ─── Migración: submissions embebidas → colección "submissions" ───────────────
+# Mueve el arreglo teams.submissions a documentos independientes, deja en el
+# equipo solo la lista "solved" y elimina el arreglo embebido.
+#
+#   python scripts/migrate_submissions.py [--dry-run]
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import db  # noqa: E402
+from app.indexes import ensure_indexes  # noqa: E402
+from app.services.submissions import SUBMISSIONS, ac_key  # noqa: E402
+
+
+async def migrate(dry_run: bool) -> None:
+    await ensure_indexes(db)
+
+    # 🗺️ El arreglo embebido no guardaba la competencia: se deduce del id del
+    # problema. Los ids los envía el cliente y pueden repetirse entre competencias;
+    # esos envíos son ambiguos y quedan sin competencia (se reportan)
+    problem_to_competition: dict[str, str] = {}
+    ambiguous: set[str] = set()
+    async for comp in db["competition"].find({}, {"id": 1, "problems.id": 1}):
+        for problem in comp.get("problems", []):
+            if problem_to_competition.setdefault(problem["id"], comp["id"]) != comp["id"]:
+                ambiguous.add(problem["id"])
+    for problem_id in ambiguous:
+        problem_to_competition.pop(problem_id, None)
+    if ambiguous:
+        print(f"⚠️  Problemas con id repetido entre competencias: {', '.join(sorted(ambiguous))}")
+
+    migrated_teams = 0
+    migrated_subs = 0
+    async for team in db["teams"].find({"submissions.0": {"$exists": True}}, {"code": 1, "submissions": 1}):
+        docs = []
+        seen_ac: set[str] = set()
+        for sub in team["submissions"]:
+            doc = {
+                "competitionId": problem_to_competition.get(sub.get("problem")),
+                "teamCode": team["code"],
+                "problem": sub.get("problem"),
+                "status": sub.get("status", "AC"),
+                "time": sub.get("time", 0),
+                "member": sub.get("member"),
+                "points": sub.get("points", 0),
+            }
+            # Clave de deduplicación del AC (índice ac_key_unique), solo para el primero
+            if doc["status"] == "AC" and doc["competitionId"]:
+                key = ac_key(doc["competitionId"], doc["teamCode"], doc["problem"])
+                if key not in seen_ac:
+                    seen_ac.add(key)
+                    doc["acKey"] = key
+            docs.append(doc)
+        solved = list(dict.fromkeys(d["problem"] for d in docs if d["status"] == "AC"))
+
+        migrated_teams += 1
+        migrated_subs += len(docs)
+        if dry_run:
+            continue
+
+        await db[SUBMISSIONS].insert_many(docs)
+        await db["teams"].update_one(
+            {"_id": team["_id"]},
+            {"$set": {"solved": solved}, "$unset": {"submissions": ""}}
+        )
+
+    print(f"Equipos migrados: {migrated_teams}, envíos movidos: {migrated_subs}{' (dry-run)' if dry_run else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(migrate(parser.parse_args().dry_run))
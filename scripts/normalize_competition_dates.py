@@ -0,0 +1,44 @@
+# ─── Migración: fechas de competencia a ISO 8601 UTC ───────────────────────────
+# Las competencias creadas antes guardaban `date` con el desfase del cliente o
+# sin zona; el listado filtra y pagina comparando strings, así que todas deben
+# quedar en el mismo formato UTC que escribe POST /competition/create.
+#
+#   python scripts/normalize_competition_dates.py [--dry-run]
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import db  # noqa: E402
+from app.routes.competition import iso_utc  # noqa: E402
+
+
+async def migrate(dry_run: bool) -> None:
+    changed = skipped = 0
+    async for comp in db["competition"].find({}, {"_id": 1, "id": 1, "date": 1}):
+        raw = comp.get("date")
+        try:
+            value = raw if isinstance(raw, datetime) else datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+        except ValueError:
+            print(f"⚠️  {comp.get('id')}: fecha inválida {raw!r}, se deja igual")
+            skipped += 1
+            continue
+
+        normalized = iso_utc(value)
+        if normalized == raw:
+            continue
+        print(f"{comp.get('id')}: {raw} → {normalized}")
+        changed += 1
+        if not dry_run:
+            await db["competition"].update_one({"_id": comp["_id"]}, {"$set": {"date": normalized}})
+
+    print(f"{'(dry-run) ' if dry_run else ''}{changed} fechas normalizadas, {skipped} inválidas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(migrate(parser.parse_args().dry_run))
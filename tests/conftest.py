@@ -0,0 +1,29 @@
+# Los tests corren contra mongomock-motor: se reemplaza la base ANTES de importar la app
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("COSMOS_URL", "mongodb://localhost:27017")
+os.environ.setdefault("COSMOS_DB", "code_arena_test")
+
+import pytest  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import app.database as database  # noqa: E402
+
+database.db = AsyncMongoMockClient()["code_arena_test"]
+database.read_db = database.db
+
+from app.indexes import ensure_indexes  # noqa: E402
+
+# Los índices únicos son parte de la lógica (ej. un solo AC por problema)
+asyncio.run(ensure_indexes(database.db))
+
+
+@pytest.fixture
+def db():
+    return database.db
@@ -0,0 +1,29 @@
+import asyncio
+
+from app.routes.ranking import stream_competition_ranking
+from app.services import scoreboard
+from app.services.broadcast import broadcaster
+
+from test_snapshots import seed_competition, solve
+
+
+def test_stream_keeps_changes_published_before_the_response_starts(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        await scoreboard.get_scoreboard(cid)
+        response = await stream_competition_ranking(cid)
+        # El AC llega después del snapshot pero antes de que el servidor empiece a enviar
+        await solve(db, cid, "A", "p0", 60)
+
+        frames = response.body_iterator
+        try:
+            snapshot = await frames.__anext__()
+            update = await asyncio.wait_for(frames.__anext__(), timeout=1)
+        finally:
+            await frames.aclose()
+        return cid, snapshot, update
+
+    cid, snapshot, update = asyncio.run(scenario())
+    assert snapshot.startswith("event: snapshot")
+    assert update.startswith("event: update") and '"A"' in update
+    assert broadcaster.count(cid) == 0
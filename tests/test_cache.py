@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.routes.competition import competition_cache
+from app.services.cache import ResponseCache
+
+
+def test_tags_only_reference_live_keys():
+    cache = ResponseCache(maxsize=4, ttl=60)
+    for n in range(1000):
+        cache.set(f"list?{n}", {"n": n}, ("competition:list",))
+    assert len(cache._tags["competition:list"]) == 4
+
+    cache.invalidate("competition:list")
+    assert cache._tags == {} and cache._key_tags == {}
+    assert cache.get("list?999") is None
+
+
+def test_expired_keys_leave_their_tags():
+    cache = ResponseCache(maxsize=4, ttl=-1)
+    cache.set("a", {}, ("t",))
+    assert cache.get("a") is None
+    assert "t" not in cache._tags
+
+
+def test_unknown_query_params_share_the_cache_entry(db):
+    async def scenario():
+        competition_cache.clear()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            for n in range(20):
+                assert (await c.get(f"/competition/all?junk={n}")).status_code == 200
+        assert len(competition_cache._tags["competition:list"]) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.services import problem_catalog, scoring
+from app.services.submissions import accept_solve
+
+from test_snapshots import seed_competition
+from test_user_cache import client, member_headers
+
+# Mismo instante UTC escrito con distintos desfases; el listado debe ordenarlos por tiempo real
+DATES = {
+    "Bogotá": "2026-05-01T20:00:00-05:00",   # 2026-05-02T01:00:00Z
+    "Madrid": "2026-05-02T00:30:00+02:00",   # 2026-05-01T22:30:00Z
+    "Sin zona": "2026-05-01T23:00:00",       # se interpreta como UTC
+}
+
+
+def _payload(title: str, date: str) -> dict:
+    return {
+        "title": title, "description": "", "maxTeamSize": 3, "date": date,
+        "status": "upcoming", "duration": 60,
+        "problems": [{"title": "Two Sum", "difficulty": "easy",
+                      "url": "https://leetcode.com/problems/two-sum/"}],
+        "rules": [], "scoring": {"easy": 1, "medium": 3, "hard": 5},
+    }
+
+
+def test_dates_are_stored_in_utc_and_listed_chronologically(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(problem_catalog, "PROBLEM_CATALOG_PATH", str(tmp_path / "catalog.sqlite3"))
+    monkeypatch.setattr(problem_catalog, "_conn", None)
+
+    async def scenario():
+        await db["competition"].delete_many({})
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            for title, date in DATES.items():
+                response = await c.post("/competition/create", json=_payload(title, date))
+                assert response.status_code == 200, response.text
+
+            stored = {comp["title"]: comp["date"] async for comp in db["competition"].find({})}
+
+            pages, cursor = [], None
+            while True:
+                params = {"limit": 1, "view": "summary"}
+                if cursor:
+                    params["cursor"] = cursor
+                page = (await c.get("/competition/all", params=params)).json()
+                pages.extend(comp["title"] for comp in page["list"])
+                cursor = page["next"]
+                if not cursor:
+                    break
+
+            window = (await c.get("/competition/all", params={
+                "from": "2026-05-01T19:00:00-04:00", "to": "2026-05-02T03:00:00+02:00",
+            })).json()
+        return stored, pages, [comp["title"] for comp in window["list"]]
+
+    stored, pages, window = asyncio.run(scenario())
+    assert stored == {
+        "Bogotá": "2026-05-02T01:00:00Z",
+        "Madrid": "2026-05-01T22:30:00Z",
+        "Sin zona": "2026-05-01T23:00:00Z",
+    }
+    assert pages == ["Bogotá", "Sin zona", "Madrid"]
+    # from = 23:00Z, to = 01:00Z: incluye ambos extremos y deja fuera a Madrid
+    assert window == ["Bogotá", "Sin zona"]
+
+
+def test_private_view_points_belong_to_this_competition(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        competition = await scoring.get_compiled(cid)
+        # Puntos de otras competencias en el total del equipo
+        await db["teams"].update_one({"code": "A"}, {"$set": {"points": 500}})
+        await accept_solve(competition, "A", "ana", competition.problem("p2"), 60)
+        async with client() as c:
+            headers = await member_headers(c, db, "A")
+            return (await c.get(f"/competition/private/{cid}", headers=headers)).json()["team"]["team"]
+
+    team = asyncio.run(scenario())
+    assert (team["points"], team["ranking"]) == (10, 1)
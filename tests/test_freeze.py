@@ -0,0 +1,77 @@
+import asyncio
+import uuid
+
+from app.routes.ranking import resolve_board
+from app.services import events, scoreboard, scoring
+from app.services.broadcast import broadcaster
+from app.services.submissions import accept_solve
+
+from test_snapshots import seed_competition, solve, standing
+from test_user_cache import client, member_headers
+
+
+async def frozen_competition(db) -> str:
+    # Empezó hace 30 min, dura 40 y se congela en los últimos 20: congelado desde el minuto 20
+    return await seed_competition(db, duration=40, freezeMinutes=20)
+
+
+def test_republish_during_freeze_does_not_leak_live_board(db):
+    async def scenario():
+        cid = await frozen_competition(db)
+        await scoreboard.get_scoreboard(cid)
+        subscriber = broadcaster.subscribe(cid)
+        try:
+            await solve(db, cid, "A", "p0", 1500)  # después del congelamiento
+            await events.publish(events.COMPETITION, cid)
+            await asyncio.sleep(0.05)
+            assert subscriber.queue.empty()
+        finally:
+            broadcaster.unsubscribe(cid, subscriber)
+
+    asyncio.run(scenario())
+
+
+def test_resolve_board_hides_solves_after_freeze(db):
+    async def scenario():
+        cid = await frozen_competition(db)
+        await scoreboard.get_scoreboard(cid)
+        await solve(db, cid, "A", "p0", 600)
+        await solve(db, cid, "B", "p0", 1500)
+        await solve(db, cid, "B", "p1", 1550)
+
+        board, view = await resolve_board(cid)
+        assert view["frozen"] is True
+        assert standing(board, "B") == (0, 0)
+        assert board.rank_of("A") == 1
+
+    asyncio.run(scenario())
+
+
+def test_other_teams_do_not_see_results_after_freeze(db):
+    async def scenario():
+        mine, rival = f"M{uuid.uuid4().hex[:6]}", f"R{uuid.uuid4().hex[:6]}"
+        for code in (mine, rival):
+            await db["teams"].insert_one({"code": code, "teamName": code, "avatar": "", "color": "#ccc",
+                                          "maxMembers": 3, "currentMembers": 1, "points": 0, "solved": []})
+        cid = await seed_competition(db, duration=40, freezeMinutes=20, teams=[mine, rival],
+                                     scoringRules=[{"name": "first_blood", "bonus": 5}])
+        competition = await scoring.get_compiled(cid)
+        await accept_solve(competition, rival, "r", competition.problem("p0"), 600)
+        await accept_solve(competition, rival, "r", competition.problem("p1"), 1500)  # congelado
+
+        async with client() as c:
+            mine_headers = await member_headers(c, db, mine)
+            rival_headers = await member_headers(c, db, rival)
+
+            seen = (await c.get(f"/teams/team/{rival}", headers=mine_headers)).json()["team"]
+            own = (await c.get(f"/teams/team/{rival}", headers=rival_headers)).json()["team"]
+            seen_subs = (await c.get(f"/teams/team/{rival}/submissions", params={"competitionId": cid},
+                                     headers=mine_headers)).json()["submissions"]
+            detail = (await c.get(f"/competition/{cid}")).json()["competition"]
+        return seen, own, seen_subs, detail
+
+    seen, own, seen_subs, detail = asyncio.run(scenario())
+    assert (seen["points"], seen["solved"]) == (15, ["p0"])
+    assert (own["points"], own["solved"]) == (30, ["p0", "p1"])
+    assert [s["problem"] for s in seen_subs] == ["p0"]
+    assert set(detail["firstBlood"]) == {"p0"}
@@ -0,0 +1,32 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+
+from app.main import app
+from app.services import problem_catalog
+
+
+def test_unreadable_catalog_counts_as_not_loaded(monkeypatch, tmp_path):
+    monkeypatch.setattr(problem_catalog, "PROBLEM_CATALOG_PATH", str(tmp_path / "missing" / "catalog.sqlite3"))
+    monkeypatch.setattr(problem_catalog, "_conn", None)
+    assert problem_catalog.is_loaded() is False
+    assert problem_catalog.is_stale() is True
+
+
+def test_create_competition_without_catalog_access(monkeypatch, tmp_path):
+    monkeypatch.setattr(problem_catalog, "PROBLEM_CATALOG_PATH", str(tmp_path / "missing" / "catalog.sqlite3"))
+    monkeypatch.setattr(problem_catalog, "_conn", None)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+            return await c.post("/competition/create", json={
+                "title": "Sin catálogo", "description": "", "maxTeamSize": 3,
+                "date": datetime.now(timezone.utc).isoformat(), "status": "upcoming", "duration": 60,
+                "problems": [{"title": "Two Sum", "difficulty": "easy",
+                              "url": "https://leetcode.com/problems/two-sum/"}],
+                "rules": [], "scoring": {"easy": 1, "medium": 3, "hard": 5},
+            })
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200, response.text
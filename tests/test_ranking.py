@@ -0,0 +1,44 @@
+import asyncio
+
+from test_scoreboard import make_board
+from test_snapshots import seed_competition, solve
+from test_user_cache import client
+
+
+def ranked_board():
+    # Posiciones: T0 (50 pts) … T4 (10 pts)
+    board = make_board([f"T{i}" for i in range(5)])
+    for i in range(5):
+        board.record(f"T{i}", "p0", 60 + i, 50 - 10 * i)
+    return board
+
+
+def test_window_positions_and_edges():
+    board = ranked_board()
+    assert [(r["code"], r["position"]) for r in board.window(0, 2)] == [("T0", 1), ("T1", 2)]
+    assert [r["code"] for r in board.window(3, 99)] == ["T3", "T4"]
+    assert board.window(5, 10) == []
+
+
+def test_around_clamps_at_both_ends():
+    board = ranked_board()
+    assert [r["code"] for r in board.around("T0", 2)] == ["T0", "T1", "T2"]
+    assert [r["code"] for r in board.around("T4", 2)] == ["T2", "T3", "T4"]
+    assert [r["code"] for r in board.around("T2", 10)] == ["T0", "T1", "T2", "T3", "T4"]
+    assert [r["code"] for r in board.around("T2", 0)] == ["T2"]
+
+
+def test_ranking_route_pages_and_around(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        await solve(db, cid, "B", "p0", 60)
+        async with client() as c:
+            page = (await c.get(f"/ranking/{cid}", params={"limit": 1, "around": "A", "radius": 3})).json()
+            missing = await c.get(f"/ranking/{cid}", params={"around": "ZZZ"})
+        return page, missing
+
+    page, missing = asyncio.run(scenario())
+    assert [r["code"] for r in page["ranking"]] == ["B"]
+    assert page["page"] == {"offset": 0, "limit": 1, "total": 2}
+    assert [(r["code"], r["position"]) for r in page["around"]] == [("B", 1), ("A", 2)]
+    assert missing.status_code == 404
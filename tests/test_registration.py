@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+
+from app.services import registration
+
+from test_snapshots import seed_competition
+from test_user_cache import client, member_headers
+
+
+def test_oversize_import_is_rejected_without_creating_teams(db, monkeypatch):
+    monkeypatch.setattr("app.routes.competition.IMPORT_MAX_ROWS", 2)
+
+    async def scenario():
+        cid = await seed_competition(db)
+        before = await db["teams"].count_documents({})
+        body = "".join(f'{{"teamName": "Excedente {i}", "maxMembers": 3}}\n' for i in range(3))
+        async with client() as c:
+            headers = await member_headers(c, db, "A")
+            r = await c.post(f"/competition/{cid}/import", headers=headers,
+                             files={"file": ("equipos.ndjson", body.encode(), "application/x-ndjson")})
+        return r, before, await db["teams"].count_documents({})
+
+    response, before, after = asyncio.run(scenario())
+    assert response.status_code == 413
+    assert after == before
+
+
+def test_parse_import_reads_csv_and_ndjson():
+    csv_rows = registration.parse_import(
+        b"\xef\xbb\xbfteamName,avatar,color,maxMembers,members\nLobos,,#fff,2, ana ; bob\n", "equipos.csv"
+    )
+    assert csv_rows == [{"teamName": "Lobos", "color": "#fff", "maxMembers": "2", "members": ["ana", "bob"]}]
+
+    ndjson_rows = registration.parse_import(b'{"teamName": "Osos"}\n\nno es json\n', "equipos.ndjson")
+    assert ndjson_rows[0] == {"teamName": "Osos"}
+    assert ndjson_rows[1].startswith("JSON inválido")
+
+
+def test_bulk_join_reports_each_team(db):
+    async def scenario():
+        cid = await seed_competition(db, teams=["A"])
+        async with client() as c:
+            headers = await member_headers(c, db, "A")
+            r = await c.post(f"/competition/{cid}/join/bulk", headers=headers,
+                             json={"teamCodes": ["A", "B", "B", "NOEXISTE"]})
+        return cid, r.json(), await db["competition"].find_one({"id": cid})
+
+    cid, body, competition = asyncio.run(scenario())
+    assert [(r["teamCode"], r["status"]) for r in body["results"]] == [
+        ("A", "already_registered"), ("B", "registered"), ("NOEXISTE", "not_found"),
+    ]
+    assert body["summary"] == {"already_registered": 1, "registered": 1, "not_found": 1}
+    assert sorted(competition["teams"]) == ["A", "B"]
+
+
+class _FailingTeams:
+    # Envuelve la base: la actualización de currentMembers falla a mitad del equipo
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        collection = self._db[name]
+        if name != "teams":
+            return collection
+
+        class Teams:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            async def update_one(self, *args, **kwargs):
+                raise RuntimeError("fallo simulado")
+
+        return Teams()
+
+
+def test_failed_team_import_rolls_back_only_that_team(db, monkeypatch):
+    async def scenario():
+        name = f"u{uuid.uuid4().hex[:8]}"
+        await db["users"].insert_one({"username": name, "email": f"{name}@x.com", "password": "x", "teamCode": None})
+        monkeypatch.setattr(registration, "db", _FailingTeams(db))
+        results, user_ids = await registration.import_teams(
+            "sin-competencia", [{"teamName": "Fallido", "members": [name]}, "JSON inválido: x"]
+        )
+        user = await db["users"].find_one({"username": name})
+        return results, user_ids, user, await db["teams"].count_documents({"teamName": "Fallido"})
+
+    results, user_ids, user, teams = asyncio.run(scenario())
+    assert [r["status"] for r in results] == ["error", "invalid"]
+    assert user_ids == []
+    assert user["teamCode"] is None
+    assert teams == 0
@@ -0,0 +1,123 @@
+import asyncio
+
+from app.services import scoreboard
+from app.services.broadcast import broadcaster
+
+from test_snapshots import seed_competition, standing
+
+
+async def solve_on_other_worker(db, cid: str, team: str, problem: str, time: int) -> None:
+    # Solo la escritura en Mongo: el evento SOLVE nunca llega a este proceso
+    await db["submissions"].insert_one({"competitionId": cid, "teamCode": team, "problem": problem,
+                                        "status": "AC", "time": time, "member": "", "points": 10,
+                                        "penalty": 0})
+
+
+def test_board_reloads_after_ttl_without_transport(db, monkeypatch):
+    async def scenario():
+        cid = await seed_competition(db)
+        await scoreboard.get_scoreboard(cid)
+        await solve_on_other_worker(db, cid, "A", "p0", 60)
+
+        monkeypatch.setattr(scoreboard, "SCOREBOARD_TTL", 60)
+        assert standing(await scoreboard.get_scoreboard(cid), "A") == (0, 0)
+
+        monkeypatch.setattr(scoreboard, "SCOREBOARD_TTL", 0)
+        assert standing(await scoreboard.get_scoreboard(cid), "A") == (10, 1)
+
+    asyncio.run(scenario())
+
+
+def test_solve_during_load_is_not_lost(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        original = scoreboard._load
+
+        async def slow_load(competition_id, engine=None):
+            board = await original(competition_id, engine)
+            # Un AC aceptado mientras la carga ya había leído Mongo
+            scoreboard.record_submission(competition_id, "A", "p0", 60, 10)
+            return board
+
+        scoreboard._load = slow_load
+        try:
+            await scoreboard.get_scoreboard(cid)
+        finally:
+            scoreboard._load = original
+        await solve_on_other_worker(db, cid, "A", "p0", 60)
+        assert standing(await scoreboard.get_scoreboard(cid), "A") == (10, 1)
+
+    asyncio.run(scenario())
+
+
+def test_board_is_cached_despite_solves_during_every_load(db, monkeypatch):
+    async def scenario():
+        cid = await seed_competition(db)
+        original = scoreboard._load
+        loads = 0
+
+        async def busy_load(competition_id, engine=None):
+            nonlocal loads
+            loads += 1
+            board = await original(competition_id, engine)
+            scoreboard.record_submission(competition_id, "B", f"p{loads % 3}", 60 + loads, 10)
+            return board
+
+        monkeypatch.setattr(scoreboard, "_load", busy_load)
+        for _ in range(5):
+            await scoreboard.get_scoreboard(cid)
+        assert loads == 1
+
+    asyncio.run(scenario())
+
+
+def test_reload_publishes_only_changed_rows(db, monkeypatch):
+    async def scenario():
+        cid = await seed_competition(db)
+        await scoreboard.get_scoreboard(cid)
+        subscriber = broadcaster.subscribe(cid)
+        try:
+            monkeypatch.setattr(scoreboard, "SCOREBOARD_TTL", 0)
+            await scoreboard.get_scoreboard(cid)
+            assert subscriber.queue.empty()  # recarga sin cambios: nada que enviar
+
+            await solve_on_other_worker(db, cid, "A", "p0", 60)
+            await scoreboard.get_scoreboard(cid)
+            frame = subscriber.queue.get_nowait()
+        finally:
+            broadcaster.unsubscribe(cid, subscriber)
+        return frame
+
+    frame = asyncio.run(scenario())
+    assert frame.startswith("event: update")
+    assert '"code":"A"' in frame and '"code":"B"' not in frame
+
+
+def make_board(codes, penalty_mode: bool = False) -> scoreboard.Scoreboard:
+    board = scoreboard.Scoreboard("c", "Copa", "", 900, {"p0": "P0", "p1": "P1"}, len(codes), penalty_mode)
+    for code in codes:
+        board.add_team(scoreboard.TeamStanding(code=code, id=code, name=code, avatar="", color=""))
+    return board
+
+
+def test_order_past_ten_hours_is_numeric():
+    board = make_board(["late", "early"])
+    # "10:00:00" < "9:59:59" como texto: el orden debe ser por segundos
+    board.record("late", "p0", 36000, 10)
+    board.record("early", "p0", 35999, 10)
+
+    assert [row["name"] for row in board.rows()] == ["early", "late"]
+    assert board.rows()[1]["totalTime"] == "10:00:00"
+    assert board.rank_of("early") == board.rank_of("late") == 1  # mismos puntos, sin penalización
+
+
+def test_icpc_penalty_ties_share_rank():
+    board = make_board(["A", "B", "C", "D"], penalty_mode=True)
+    board.record("A", "p0", 36000, 1, penalty=37200)
+    board.record("B", "p0", 35999, 1, penalty=37200)
+    board.record("C", "p0", 100, 1, penalty=36001)
+    board.record("D", "p0", 50, 1, penalty=40000)
+
+    assert [row["name"] for row in board.rows()] == ["C", "B", "A", "D"]
+    assert [board.rank_of(code) for code in "CBAD"] == [1, 2, 2, 4]
+    assert board.rows()[1]["totalTime"] == "10:20:00"
@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services import events, scoreboard, snapshots
+from app.services.snapshots import board_at, write_snapshot
+
+
+async def seed_competition(db, **extra) -> str:
+    cid = f"c-{uuid.uuid4().hex[:8]}"
+    await db["competition"].insert_one({
+        "id": cid, "title": "Copa", "description": "", "maxTeamSize": 3,
+        "date": (datetime.now(timezone.utc) - timedelta(minutes=30)).isoformat(),
+        "status": "active", "duration": 120, "teams": ["A", "B"],
+        "problems": [{"id": f"p{j}", "title": f"P{j}", "difficulty": "easy",
+                      "url": "https://leetcode.com/problems/two-sum/"} for j in range(3)],
+        "rules": [], "scoring": {"easy": 10, "medium": 10, "hard": 10},
+        **extra,
+    })
+    for code in ("A", "B"):
+        await db["teams"].update_one(
+            {"code": code},
+            {"$setOnInsert": {"code": code, "teamName": code, "avatar": "", "color": "#ccc"}},
+            upsert=True,
+        )
+    return cid
+
+
+async def solve(db, cid: str, team: str, problem: str, time: int, points: int = 10) -> None:
+    await db["submissions"].insert_one({"competitionId": cid, "teamCode": team, "problem": problem,
+                                        "status": "AC", "time": time, "member": "", "points": points,
+                                        "penalty": 0})
+    scoreboard.record_submission(cid, team, problem, time, points)
+
+
+def standing(board, code: str) -> tuple[int, int]:
+    return board.teams[code].points, board.teams[code].solves
+
+
+def test_snapshot_does_not_double_count_solves_after_its_bucket(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        live = await scoreboard.get_scoreboard(cid)
+        await solve(db, cid, "A", "p0", 75)
+        # El snapshot se toma en t=90, después del AC de t=75
+        await write_snapshot(live, 90)
+
+        assert standing(await board_at(cid, 100), "A") == (10, 1)
+        assert standing(await board_at(cid, 65), "A") == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_board_at_replays_solves_after_the_snapshot(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        live = await scoreboard.get_scoreboard(cid)
+        await solve(db, cid, "A", "p0", 75)
+        await write_snapshot(live, 90)
+        await solve(db, cid, "A", "p1", 95)
+        await solve(db, cid, "B", "p0", 130)
+
+        at_100 = await board_at(cid, 100)
+        assert standing(at_100, "A") == (20, 2)
+        assert standing(at_100, "B") == (0, 0)
+        assert standing(await board_at(cid, 200), "B") == (10, 1)
+
+    asyncio.run(scenario())
+
+
+def test_board_at_recovers_solves_missing_from_the_writer_board(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        live = await scoreboard.get_scoreboard(cid)
+        # AC en t=75 que el tablero de quien escribe aún no tenía (otro worker, en vuelo)
+        await db["submissions"].insert_one({"competitionId": cid, "teamCode": "A", "problem": "p0",
+                                            "status": "AC", "time": 75, "member": "", "points": 10,
+                                            "penalty": 0})
+        await write_snapshot(live, 90)
+
+        assert standing(await board_at(cid, 100), "A") == (10, 1)
+
+    asyncio.run(scenario())
+
+
+def test_only_the_lease_holder_writes_snapshots(db, monkeypatch):
+    async def scenario():
+        cid = await seed_competition(db)
+        assert await snapshots._hold_lease(cid)
+
+        monkeypatch.setattr(events, "origin", lambda: "otro-worker")
+        assert not await snapshots._hold_lease(cid)
+
+        # Lease vencido: otro worker lo toma
+        await db[snapshots.SNAPSHOT_LEASES].update_one(
+            {"_id": cid}, {"$set": {"until": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+        )
+        assert await snapshots._hold_lease(cid)
+
+    asyncio.run(scenario())
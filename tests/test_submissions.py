@@ -0,0 +1,99 @@
+import asyncio
+
+from app.services import scoring
+from app.services.submissions import accept_solve, ac_key, submission_doc
+
+from test_snapshots import seed_competition
+from test_user_cache import client, member_headers
+
+FIRST_BLOOD = [{"name": "first_blood", "bonus": 50}]
+
+
+def test_first_blood_bonus_is_added_to_the_team(db):
+    async def scenario():
+        cid = await seed_competition(db, scoringRules=FIRST_BLOOD)
+        competition = await scoring.get_compiled(cid)
+        await db["teams"].update_one({"code": "A"}, {"$set": {"points": 0, "solved": []}})
+
+        submission = await accept_solve(competition, "A", "ana", competition.problem("p1"), 60)
+        assert submission["points"] == 60
+        assert (await db["teams"].find_one({"code": "A"}))["points"] == 60
+
+    asyncio.run(scenario())
+
+
+def test_duplicate_solve_does_not_claim_first_blood(db):
+    async def scenario():
+        cid = await seed_competition(db, scoringRules=FIRST_BLOOD)
+        competition = await scoring.get_compiled(cid)
+        # Otro miembro del equipo ya ganó el AC, pero aún no se reclamó el primer AC
+        await db["teams"].update_one({"code": "A"}, {"$set": {"points": 10, "solved": ["p1"]}})
+        await db["submissions"].insert_one({**submission_doc(cid, "A", "p1", "AC", 60, "ana", 10),
+                                            "acKey": ac_key(cid, "A", "p1")})
+
+        assert await accept_solve(competition, "A", "bob", competition.problem("p1"), 61) is None
+        stored = await db["competition"].find_one({"id": cid})
+        assert "p1" not in (stored.get("firstBlood") or {})
+
+    asyncio.run(scenario())
+
+
+def test_same_problem_id_counts_in_each_competition(db):
+    async def scenario():
+        first = await scoring.get_compiled(await seed_competition(db))
+        second = await scoring.get_compiled(await seed_competition(db))
+        await db["teams"].update_one({"code": "A"}, {"$set": {"points": 0, "solved": []}})
+
+        assert await accept_solve(first, "A", "ana", first.problem("p0"), 60) is not None
+        # Los ids de problema los define el cliente: `p0` existe en ambas competencias
+        assert await accept_solve(second, "A", "ana", second.problem("p0"), 90) is not None
+        assert await accept_solve(second, "A", "bob", second.problem("p0"), 95) is None
+        return second.id
+
+    cid = asyncio.run(scenario())
+
+    async def check():
+        team = await db["teams"].find_one({"code": "A"})
+        count = await db["submissions"].count_documents({"competitionId": cid, "teamCode": "A", "status": "AC"})
+        return team["points"], count
+
+    assert asyncio.run(check()) == (20, 1)
+
+
+def test_batch_submission_reports_each_problem(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        await db["teams"].update_one({"code": "B"}, {"$set": {"points": 0, "solved": []}})
+        async with client() as c:
+            headers = await member_headers(c, db, "B")
+            await c.post(f"/competition/submission/{cid}/p0", headers=headers)
+            r = await c.post(f"/competition/submission/{cid}", headers=headers,
+                             json={"problems": ["p0", "p1", "p1", "nope"]})
+        return r
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [(r["problem"], r["ok"], r.get("status")) for r in body["results"]] == [
+        ("p0", False, 409), ("p1", True, None), ("nope", False, 404),
+    ]
+    assert (body["accepted"], body["points"]) == (1, 10)
+
+
+def test_concurrent_solves_do_not_lose_points(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        competition = await scoring.get_compiled(cid)
+        await db["teams"].update_one({"code": "B"}, {"$set": {"points": 0, "solved": []}})
+        # Tres problemas distintos y cada uno enviado por dos miembros a la vez
+        results = await asyncio.gather(*(
+            accept_solve(competition, "B", member, competition.problem(f"p{j}"), 60 + j)
+            for j in range(3) for member in ("ana", "bob")
+        ))
+        team = await db["teams"].find_one({"code": "B"})
+        return results, team
+
+    results, team = asyncio.run(scenario())
+    assert sum(r is not None for r in results) == 3
+    assert team["points"] == 30
+    assert sorted(team["solved"]) == ["p0", "p1", "p2"]
@@ -0,0 +1,56 @@
+import asyncio
+import uuid
+
+import httpx
+
+from app.main import app
+
+from test_snapshots import seed_competition
+
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def member_headers(c, db, team_code: str) -> dict:
+    name = f"u{uuid.uuid4().hex[:8]}"
+    r = await c.post("/users/register", json={"username": name, "email": f"{name}@x.com", "password": "pw"})
+    await db["users"].update_one({"username": name}, {"$set": {"teamCode": team_code}})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_submission_uses_current_team_not_cached_one(db):
+    async def scenario():
+        cid = await seed_competition(db)
+        name = f"u{uuid.uuid4().hex[:8]}"
+        async with client() as c:
+            r = await c.post("/users/register", json={"username": name, "email": f"{name}@x.com", "password": "pw"})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+            await db["users"].update_one({"username": name}, {"$set": {"teamCode": "A"}})
+            assert (await c.get("/users/me", headers=headers)).json()["teamCode"] == "A"
+
+            # Otro worker cambia el equipo: la caché de este proceso no se entera
+            await db["users"].update_one({"username": name}, {"$set": {"teamCode": "B"}})
+            r = await c.post(f"/competition/submission/{cid}/p0", headers=headers)
+            assert r.status_code == 200, r.text
+
+        submission = await db["submissions"].find_one({"competitionId": cid})
+        assert submission["teamCode"] == "B"
+
+    asyncio.run(scenario())
+
+
+def test_cache_and_hash_counters_are_exported_through_metrics(db):
+    async def scenario():
+        async with client() as c:
+            await member_headers(c, db, "A")  # registro: un hash y una invalidación de caché
+            metrics = (await c.get("/metrics")).text
+            old = [(await c.get(path)).status_code for path in ("/auth/cache/stats", "/auth/hash/stats")]
+        return metrics, old
+
+    metrics, old = asyncio.run(scenario())
+    assert 'user_cache_hits_total{level="local"}' in metrics
+    assert "user_cache_entries " in metrics
+    completed = next(line for line in metrics.splitlines() if line.startswith("password_hash_completed_total"))
+    assert int(completed.split()[-1]) >= 1
+    assert old == [404, 404]
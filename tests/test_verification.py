@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services import verification
+
+from test_snapshots import seed_competition
+from test_user_cache import client
+
+
+async def seed_pending(db, count: int) -> str:
+    cid = f"c-{uuid.uuid4().hex[:8]}"
+    await db["submissions"].insert_many([
+        {"competitionId": cid, "teamCode": "A", "problem": f"p{i}", "status": "PENDING", "time": i,
+         "member": "ana", "points": 0, "penalty": 0}
+        for i in range(count)
+    ])
+    return cid
+
+
+def claimed_in(docs: list[dict], cid: str) -> set:
+    return {doc["_id"] for doc in docs if doc["competitionId"] == cid}
+
+
+def test_workers_claim_disjoint_pending_submissions(db):
+    async def scenario():
+        cid = await seed_pending(db, 6)
+        now = datetime.now(timezone.utc)
+        first, second = await asyncio.gather(verification._claim_pending(now), verification._claim_pending(now))
+        a, b = claimed_in(first, cid), claimed_in(second, cid)
+        assert not a & b
+        assert len(a | b) == 6
+        # Con el lease vigente nadie más los toma; al vencer se pueden retomar
+        assert not claimed_in(await verification._claim_pending(now), cid)
+        later = now + timedelta(seconds=verification.VERIFY_LEASE + 1)
+        assert len(claimed_in(await verification._claim_pending(later), cid)) == 6
+
+    asyncio.run(scenario())
+
+
+def test_leetcode_username_is_set_on_register_and_profile_update(db, monkeypatch):
+    async def scenario():
+        cid = await seed_competition(db)
+        name = f"u{uuid.uuid4().hex[:8]}"
+        async with client() as c:
+            r = await c.post("/users/register", json={"username": name, "email": f"{name}@x.com",
+                                                      "password": "pw", "leetcode_username": "ana_lc"})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+            registered = (await c.get("/users/me", headers=headers)).json()["leetcode_username"]
+
+            invalid = await c.patch("/users/me", headers=headers, json={"leetcode_username": "no válido"})
+            await c.patch("/users/me", headers=headers, json={"leetcode_username": None})
+            cleared = (await c.get("/users/me", headers=headers)).json()["leetcode_username"]
+
+            # Con verificación activa, sin usuario de LeetCode el envío se rechaza de inmediato
+            monkeypatch.setattr(verification, "VERIFY_ENABLED", True)
+            await db["users"].update_one({"username": name}, {"$set": {"teamCode": "A"}})
+            blocked = await c.post(f"/competition/submission/{cid}/p0", headers=headers)
+        return registered, invalid.status_code, cleared, blocked.status_code
+
+    assert asyncio.run(scenario()) == ("ana_lc", 422, None, 400)